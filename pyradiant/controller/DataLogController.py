@@ -23,8 +23,8 @@ from PyQt6 import QtWidgets, QtCore
 
 from ..widget.Widgets import open_file_dialog, open_files_dialog, save_file_dialog
 
-import numpy as np
 from ..model.helper.HelperModule import get_partial_index , get_partial_value
+from ..model.helper.numeric import clip_to_nan
 from .. widget.DataHistoryWidget import dataHistoryWidget
 from ..model.TemperatureModel import TemperatureModel
 from .NewFileInDirectoryWatcher import NewFileInDirectoryWatcher
@@ -60,6 +60,13 @@ class DataLogController(QtCore.QObject):
         self._exp_working_dir = ''
         self._setting_working_dir = ''
 
+        # log updates arrive in bursts (e.g. batch processing), the plots are redrawn once per burst
+        self._last_spe_file = None
+        self.update_log_display_timer = QtCore.QTimer(self)
+        self.update_log_display_timer.setSingleShot(True)
+        self.update_log_display_timer.setInterval(50)
+        self.update_log_display_timer.timeout.connect(self.update_log_display)
+
         self.create_signals()
 
 
@@ -93,8 +100,8 @@ class DataLogController(QtCore.QObject):
     
     def clear_log_display(self):
         self.model.clear_log()
-        self.widget.temperatures_plot_widget.plot_ds_time_lapse([],[] )
-        self.widget.temperatures_plot_widget.plot_us_time_lapse([], [])
+        self.widget.temperatures_plot_widget.plot_ds_time_lapse([])
+        self.widget.temperatures_plot_widget.plot_us_time_lapse([])
 
 
     def connect_click_function(self, emitter, function):
@@ -119,34 +126,24 @@ class DataLogController(QtCore.QObject):
 
             records = self.model.load_last_n_records(str(filename),DATALOG_LENGTH)
             
-            self.model.data_records=records
+            self.model.temperature_records=records.tolist()
             T_DS, T_US = self.model.get_temperatures()
             #T_DS = T_DS[-200:]
             #T_US = T_US[-200:]
-            T_DS[T_DS<=MIN_TEMPERATURE] = np.nan
-            T_US[T_US<=MIN_TEMPERATURE] = np.nan
-            T_DS[T_DS >MAX_TEMPERATURE] = np.nan
-            T_US[T_US >MAX_TEMPERATURE] = np.nan
-            
-            x_DS = np.arange(T_DS.shape[0])
-            x_US = np.arange(T_US.shape[0])
+            clip_to_nan(T_DS, MIN_TEMPERATURE, MAX_TEMPERATURE)
+            clip_to_nan(T_US, MIN_TEMPERATURE, MAX_TEMPERATURE)
 
-            self.widget.temperatures_plot_widget.plot_ds_time_lapse(x_DS, T_DS)
-            self.widget.temperatures_plot_widget.plot_us_time_lapse(x_US, T_US)
+            self.widget.temperatures_plot_widget.plot_ds_time_lapse(T_DS)
+            self.widget.temperatures_plot_widget.plot_us_time_lapse(T_US)
 
             T_DS, T_US = self.model_static.get_temperatures(DATALOG_LENGTH)
             #T_DS = T_DS[-200:]
             #T_US = T_US[-200:]
-            T_DS[T_DS<=MIN_TEMPERATURE] = np.nan
-            T_US[T_US<=MIN_TEMPERATURE] = np.nan
-            T_DS[T_DS >MAX_TEMPERATURE] = np.nan
-            T_US[T_US >MAX_TEMPERATURE] = np.nan
-            
-            x_DS = np.arange(T_DS.shape[0])
-            x_US = np.arange(T_US.shape[0])
+            clip_to_nan(T_DS, MIN_TEMPERATURE, MAX_TEMPERATURE)
+            clip_to_nan(T_US, MIN_TEMPERATURE, MAX_TEMPERATURE)
 
-            self.widget.static_temperature_plot_widget.plot_ds_time_lapse(x_DS, T_DS)
-            self.widget.static_temperature_plot_widget.plot_us_time_lapse(x_US, T_US)
+            self.widget.static_temperature_plot_widget.plot_ds_time_lapse(T_DS)
+            self.widget.static_temperature_plot_widget.plot_us_time_lapse(T_US)
 
             fname = os.path.split(filename)[-1]
             dirname = os.path.sep.join(os.path.dirname(filename).split(os.path.sep)[-2:])
@@ -168,37 +165,30 @@ class DataLogController(QtCore.QObject):
         self.model.add_record(log_dict)
         self.model_static.update_record(**log_dict)
 
-        spe_file = log_dict.get('# File')
-        spe_file_static_index = self.model_static.get_record_index(spe_file) # for moving the cursor, etc
+        self._last_spe_file = log_dict.get('# File')
+        self.update_log_display_timer.start()
+
+    def update_log_display(self):
+        spe_file_static_index = self.model_static.get_record_index(self._last_spe_file) # for moving the cursor, etc
        
         T_DS, T_US = self.model.get_temperatures()
         #T_DS = T_DS[-200:]
         #T_US = T_US[-200:]
-        T_DS[T_DS<=MIN_TEMPERATURE] = np.nan
-        T_US[T_US<=MIN_TEMPERATURE] = np.nan
-        T_DS[T_DS >MAX_TEMPERATURE] = np.nan
-        T_US[T_US >MAX_TEMPERATURE] = np.nan
-        
-        x_DS = np.arange(T_DS.shape[0])
-        x_US = np.arange(T_US.shape[0])
+        clip_to_nan(T_DS, MIN_TEMPERATURE, MAX_TEMPERATURE)
+        clip_to_nan(T_US, MIN_TEMPERATURE, MAX_TEMPERATURE)
 
-        self.widget.temperatures_plot_widget.plot_ds_time_lapse(x_DS, T_DS)
-        self.widget.temperatures_plot_widget.plot_us_time_lapse(x_US, T_US)
-        self.widget.temperatures_plot_widget.cursor_item.setPos(len(x_US))
+        self.widget.temperatures_plot_widget.plot_ds_time_lapse(T_DS)
+        self.widget.temperatures_plot_widget.plot_us_time_lapse(T_US)
+        self.widget.temperatures_plot_widget.cursor_item.setPos(len(T_US))
 
         T_DS, T_US = self.model_static.get_temperatures(DATALOG_LENGTH)
         #T_DS = T_DS[-200:]
         #T_US = T_US[-200:]
-        T_DS[T_DS<=MIN_TEMPERATURE] = np.nan
-        T_US[T_US<=MIN_TEMPERATURE] = np.nan
-        T_DS[T_DS >MAX_TEMPERATURE] = np.nan
-        T_US[T_US >MAX_TEMPERATURE] = np.nan
-        
-        x_DS = np.arange(T_DS.shape[0])
-        x_US = np.arange(T_US.shape[0])
+        clip_to_nan(T_DS, MIN_TEMPERATURE, MAX_TEMPERATURE)
+        clip_to_nan(T_US, MIN_TEMPERATURE, MAX_TEMPERATURE)
 
-        self.widget.static_temperature_plot_widget.plot_ds_time_lapse(x_DS, T_DS)
-        self.widget.static_temperature_plot_widget.plot_us_time_lapse(x_US, T_US)
+        self.widget.static_temperature_plot_widget.plot_ds_time_lapse(T_DS)
+        self.widget.static_temperature_plot_widget.plot_us_time_lapse(T_US)
         if spe_file_static_index:
             self.widget.static_temperature_plot_widget.cursor_item.setPos(spe_file_static_index)
 
@@ -30,9 +30,13 @@ from .TemperatureController import TemperatureController
 from .. widget.DataHistoryWidget import dataHistoryWidget
 from .DataLogController import DataLogController
 from .ConfigurationController import ConfigurationController
-from ..model.helper.AppSettings import AppSettings
+from ..model.helper.AppSettings import get_app_settings
 from .. import style_path
 
+_WS_MIN = QtCore.Qt.WindowState.WindowMinimized
+_WS_ACTIVE = QtCore.Qt.WindowState.WindowActive
+_IS_MACOS = sys.platform == "darwin"
+
 class MainController(object):
     def __init__(self,app):
         self.app = app  # app object
@@ -43,10 +47,12 @@ class MainController(object):
 
         self.main_widget.setWindowTitle('PyRadiant ' + __version__)
 
+        self._shutdown_finalized = False
+
         self.create_signals()
         self.create_data_models()
         self.create_sub_controller()
-        self.settings = AppSettings()
+        self.settings = get_app_settings()
         self.load_settings()
         #self.load_stylesheet()
         self.configuration_controller = ConfigurationController(
@@ -60,9 +66,9 @@ class MainController(object):
 
     def show_window(self):
         self.main_widget.show()
-        if sys.platform == "darwin":
+        if _IS_MACOS:
             self.main_widget.setWindowState(
-                self.main_widget.windowState() & ~QtCore.Qt.WindowState.WindowMinimized | QtCore.Qt.WindowState.WindowActive)
+                self.main_widget.windowState() & ~_WS_MIN | _WS_ACTIVE)
             self.main_widget.activateWindow()
             self.main_widget.raise_()
 
@@ -82,53 +88,23 @@ class MainController(object):
         #self.raman_controller = RamanController(self.raman_model, self.main_widget.raman_widget)
 
     def load_settings(self):
-        try:
-            self.temperature_controller.load_settings(self.settings)
-        except (AttributeError, TypeError):
-            pass
-        '''try:
-            self.ruby_controller.load_settings(self.settings)
-        except (AttributeError, TypeError):
-            pass
-        try:
-            self.diamond_controller.load_settings(self.settings)
-        except (AttributeError, TypeError):
-            pass
-        try:
-            self.raman_controller.load_settings(self.settings)
-        except (AttributeError, TypeError):
-            pass'''
+        temperature_controller = getattr(self, 'temperature_controller', None)
+        if temperature_controller is not None:
+            temperature_controller.load_settings(self.settings)
 
     def save_settings(self):
-        self.temperature_controller.save_settings(self.settings)
-        '''self.ruby_controller.save_settings(self.settings)
-        self.diamond_controller.save_settings(self.settings)
-        self.raman_controller.save_settings(self.settings)'''
+        temperature_controller = getattr(self, 'temperature_controller', None)
+        if temperature_controller is not None:
+            temperature_controller.save_settings(self.settings)
+        self.settings.sync()
 
     def create_signals(self):
-        self.main_widget.closeEvent = self.closeEvent
+        self.main_widget.closing.connect(self.main_widget_closing)
+        # makes sure the settings are saved even if the event loop exits before the deferred shutdown ran
+        self.app.aboutToQuit.connect(self._finalize_shutdown)
 
         #self.main_widget.navigation_widget.temperature_btn.clicked.connect(
         #    self.navigation_temperature_btn_clicked)
-        '''self.main_widget.navigation_widget.ruby_btn.clicked.connect(
-            self.navigation_ruby_btn_clicked)
-        self.main_widget.navigation_widget.diamond_btn.clicked.connect(
-            self.navigation_diamond_btn_clicked
-        )
-        self.main_widget.navigation_widget.raman_btn.clicked.connect(
-            self.navigation_raman_btn_clicked)'''
-
-    '''def navigation_ruby_btn_clicked(self):
-        self.hide_module_widgets()
-        self.main_widget.ruby_widget.show()'''
-
-    '''def navigation_diamond_btn_clicked(self):
-        self.hide_module_widgets()
-        self.main_widget.diamond_widget.show()
-
-    def navigation_raman_btn_clicked(self):
-        self.hide_module_widgets()
-        self.main_widget.raman_widget.show()'''
 
     def navigation_temperature_btn_clicked(self):
         self.hide_module_widgets()
@@ -136,17 +112,17 @@ class MainController(object):
 
     def hide_module_widgets(self):
         self.main_widget.temperature_widget.hide()
-        
-        '''self.main_widget.ruby_widget.hide()
-        self.main_widget.diamond_widget.hide()
-        self.main_widget.raman_widget.hide()'''
 
-    def closeEvent(self, event):
-        self.save_settings()
-      
-        self.main_widget.close()
+    def main_widget_closing(self):
+        # the window is hidden right away, settings and log files are written once the event loop is idle
         self.data_history_widget.close()
-        self.temperature_controller.close_log()
-        event.accept()
+        QtCore.QTimer.singleShot(0, self._finalize_shutdown)
 
-    
\ No newline at end of file
+    def _finalize_shutdown(self):
+        if self._shutdown_finalized:
+            return
+        self._shutdown_finalized = True
+        self.save_settings()
+        temperature_controller = getattr(self, 'temperature_controller', None)
+        if temperature_controller is not None:
+            temperature_controller.close_log()
@@ -18,14 +18,52 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import os
+import sys
 import time
 
 from PyQt6 import QtCore, QtWidgets
 
+# file systems on which change notifications of other hosts are not delivered, these are still polled
+NETWORK_FS_TYPES = {'nfs', 'nfs4', 'cifs', 'smbfs', 'smb3', 'afs', 'fuse.sshfs'}
+
+
+def is_local_path(path):
+    """
+    Checks whether path is on a local file system, for which the operating system delivers change notifications.
+    :param path: folder path
+    :return: True if the folder is known to be local, False if it is on a network share or if it can not be determined
+    """
+    path = os.path.realpath(path)
+    if sys.platform.startswith('linux'):
+        try:
+            with open('/proc/mounts') as f:
+                mounts = [line.split()[1:3] for line in f]
+        except OSError:
+            return False
+        fs_type = None
+        best_match = ''
+        for mount_point, mount_fs_type in mounts:
+            mount_point = mount_point.replace('\\040', ' ')
+            if (path == mount_point or path.startswith(mount_point.rstrip('/') + '/')) \
+                    and len(mount_point) > len(best_match):
+                best_match = mount_point
+                fs_type = mount_fs_type
+        return fs_type is not None and fs_type not in NETWORK_FS_TYPES
+    elif sys.platform == 'win32':
+        if path.startswith('\\\\'):
+            return False
+        import ctypes
+        DRIVE_REMOTE = 4
+        drive = os.path.splitdrive(path)[0] + '\\'
+        return ctypes.windll.kernel32.GetDriveTypeW(drive) != DRIVE_REMOTE
+    return False
+
 
 class NewFileInDirectoryWatcher(QtCore.QObject):
     """
     This class watches a given filepath for any new files with a given file extension added to it.
+    Folders on local file systems are watched with a QFileSystemWatcher, folders on network shares (or when the
+    file system can not be determined) are polled every interval ms.
 
     Typical usage::
         def callback_fcn(path):
@@ -45,7 +83,15 @@ class NewFileInDirectoryWatcher(QtCore.QObject):
         """
         super(NewFileInDirectoryWatcher, self).__init__()
 
-        self._file_system_watcher = QtCore.QFileSystemWatcher()
+        self._active = False
+        self._file_system_watcher = QtCore.QFileSystemWatcher(self)
+        self._file_system_watcher.directoryChanged.connect(self.directory_changed)
+
+        self.interval = interval
+        self.check_timer = QtCore.QTimer(self)
+        self.check_timer.setInterval(interval)
+        self.check_timer.timeout.connect(self.check_files)
+
         if path is None:
             path = os.getcwd()
         self.path = path
@@ -55,13 +101,8 @@ class NewFileInDirectoryWatcher(QtCore.QObject):
         else:
             self.file_types = set(file_types)
 
-        self.interval = interval
-        self.check_timer = QtCore.QTimer(self)
-        self.check_timer.setInterval(interval)
-        self.check_timer.timeout.connect(self.check_files)
-
         if activate:
-            self.check_timer.start()
+            self.activate()
 
     @property
     def path(self):
@@ -69,24 +110,45 @@ class NewFileInDirectoryWatcher(QtCore.QObject):
 
     @path.setter
     def path(self, new_path):
+        active = self._active
+        if active:
+            self.deactivate()
         self._path = new_path
+        self._use_file_system_events = is_local_path(new_path)
         self._files_in_path = os.listdir(new_path)
+        if active:
+            self.activate()
         #print(f'directory watcher path: {self._path}')
 
     def activate(self):
         """
         activates the watcher to emit signals when a new file is added
         """
-        if not self.check_timer.isActive():
+        if not self._active:
+            self._active = True
             self._files_in_path = os.listdir(self.path)
-            self.check_timer.start()
+            if self._use_file_system_events:
+                # the timer is then only used to re-check files which were still being written
+                self.check_timer.setSingleShot(True)
+                self._file_system_watcher.addPath(self.path)
+            else:
+                self.check_timer.setSingleShot(False)
+                self.check_timer.start()
 
     def deactivate(self):
         """
         deactivates the watcher so it will not emit a signal when a new file is added
         """
-        if self.check_timer.isActive():
+        if self._active:
+            self._active = False
             self.check_timer.stop()
+            directories = self._file_system_watcher.directories()
+            if directories:
+                self._file_system_watcher.removePaths(directories)
+
+    def directory_changed(self, path):
+        if self._active:
+            self.check_files()
 
     def check_files(self):
         """
@@ -123,5 +185,8 @@ class NewFileInDirectoryWatcher(QtCore.QObject):
                             time.sleep(self.interval/1000.)
                     self.file_added.emit(new_file_path)
                 else:
+                    # the file is still being written, writing does not change the directory, so check again later
+                    if self._use_file_system_events:
+                        self.check_timer.start()
                     return
         self._files_in_path = files_now
@@ -18,6 +18,8 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import os
+from contextlib import contextmanager
+from functools import lru_cache
 
 from PyQt6 import QtWidgets, QtCore
 
@@ -47,6 +49,18 @@ else:
     PV = None
 
 
+@lru_cache(maxsize=64)
+def _file_label(filename):
+    """
+    Returns the normalized filename and the label shown for it (last two folders and file name), results are
+    cached since the same file is displayed again on every frame/calculation update.
+    """
+    normpath = os.path.normpath(filename)
+    fname = os.path.split(normpath)[-1]
+    dirname = os.path.sep.join(os.path.dirname(normpath).split(os.path.sep)[-2:])
+    return normpath, os.path.join(dirname, fname)
+
+
 class TemperatureController(QtCore.QObject):
 
     temperature_folder_changed = QtCore.pyqtSignal()
@@ -81,6 +95,7 @@ class TemperatureController(QtCore.QObject):
         self.live_data = False # this is True when AD checkbox is checked and an area detector connection is established, otherwise it's False
         self._AD_watcher = None
         self.epics_available = False
+        self._pvs = {}  # PV objects by name, connections are kept open for the session
         
 
         self.widget.frame_num_txt.clearFocus()
@@ -88,6 +103,31 @@ class TemperatureController(QtCore.QObject):
 
         
         self._create_autoprocess_system()
+
+        # fitting all frames is expensive, several requests for the same file within one event loop iteration
+        # result in a single update_time_lapse
+        self.update_time_lapse_timer = QtCore.QTimer(self)
+        self.update_time_lapse_timer.setSingleShot(True)
+        self.update_time_lapse_timer.setInterval(0)
+        self.update_time_lapse_timer.timeout.connect(self.update_time_lapse)
+
+        self._wl_calibration_rectangle = (None, None, None)
+
+        self._settings_cb_model = QtCore.QStringListModel(self)
+        self.widget.settings_cb.setModel(self._settings_cb_model)
+
+        self._roi_mouse_pos = (-1, -1)
+        self.roi_mouse_timer = QtCore.QTimer(self)
+        self.roi_mouse_timer.setSingleShot(True)
+        self.roi_mouse_timer.setInterval(16)
+        self.roi_mouse_timer.timeout.connect(self.update_roi_mouse_pos)
+
+        # while rois are dragged only the latest limits are applied, at most once per interval
+        self._pending_roi_list = None
+        self.roi_update_timer = QtCore.QTimer(self)
+        self.roi_update_timer.setSingleShot(True)
+        self.roi_update_timer.setInterval(16)
+        self.roi_update_timer.timeout.connect(self.update_rois)
         
         self.create_signals()
 
@@ -170,6 +210,7 @@ class TemperatureController(QtCore.QObject):
 
         self.connect_click_function(self.widget.save_data_btn, self.save_data_btn_clicked)
         self.connect_click_function(self.widget.save_graph_btn, self.save_graph_btn_clicked)
+        self.widget.temperature_spectrum_widget.graph_save_failed.connect(self.graph_save_failed)
 
         self.temperature_folder_changed.connect(self.temperature_folder_changed_emitted)
         self.epics_datalog_file_changed.connect(self.epics_datalog_file_changed_emitted)
@@ -297,7 +338,17 @@ class TemperatureController(QtCore.QObject):
             num_frames = self.model.current_configuration.data_img_file.num_frames
             if num_frames>1:
                 
-                self.update_time_lapse()
+                self.update_time_lapse_timer.start()
+
+    def finish_pending_time_lapse(self):
+        """
+        Fits all frames of the current file right away if its update_time_lapse is still pending. Has to be called
+        before another data file is loaded, fit_all_frames also writes every frame to the log and the frames of the
+        previous file would otherwise be lost.
+        """
+        if self.update_time_lapse_timer.isActive():
+            self.update_time_lapse_timer.stop()
+            self.update_time_lapse()
 
     def load_data_file(self, filenames=None):
         if isinstance(filenames, str):
@@ -310,6 +361,7 @@ class TemperatureController(QtCore.QObject):
             if filename != '':
                 if os.path.isfile(filename):
                     self._exp_working_dir = os.path.dirname(str(filename))
+                    self.finish_pending_time_lapse()
                     self.model.current_configuration.load_data_image(str(filename))
                     self._directory_watcher.path = self._exp_working_dir
                     # hack, refactor later:
@@ -321,6 +373,7 @@ class TemperatureController(QtCore.QObject):
 
     def load_data_file_ad(self, filename=None):
         if isinstance(filename, str):
+            self.finish_pending_time_lapse()
             self.model.current_configuration.load_data_image_ad(self._AD_watcher)
             # hack, refactor later:
             self.process_multiframe()
@@ -334,6 +387,7 @@ class TemperatureController(QtCore.QObject):
             mode = 'number'
         else:
             mode = 'time'
+        self.finish_pending_time_lapse()
         self.model.current_configuration.load_next_data_image(mode)
         
         # hack, refactor later:
@@ -345,6 +399,7 @@ class TemperatureController(QtCore.QObject):
             mode = 'number'
         else:
             mode = 'time'
+        self.finish_pending_time_lapse()
         self.model.current_configuration.load_previous_data_image(mode)
 
         # hack, refactor later:
@@ -477,10 +532,12 @@ class TemperatureController(QtCore.QObject):
                 self.widget,
                 caption="Save data in tabulated text format",
                 directory=os.path.join(self._exp_working_dir,
-                                       '.'.join(self.model.current_configuration.data_img_file.filename.split(".")[:-1]) + ".txt")
+                                       os.path.splitext(self.model.current_configuration.data_img_file.filename)[0] + ".txt"),
+                filter='Text (*.txt);; HDF5 (*.h5)'
             )
         if filename != '':
-            self.model.current_configuration.save_txt(filename)
+            binary = os.path.splitext(filename)[1].lower() == '.h5'
+            self.model.current_configuration.save_txt(filename, binary=binary)
 
     def save_graph_btn_clicked(self, filename=None):
         if filename is None or filename is False:
@@ -488,7 +545,7 @@ class TemperatureController(QtCore.QObject):
                 self.widget,
                 caption="Save displayed graph as vector graphics or image",
                 directory=os.path.join(self._exp_working_dir,
-                                       '.'.join(self.model.current_configuration.data_img_file.filename.split(".")[:-1]) + ".svg"),
+                                       os.path.splitext(self.model.current_configuration.data_img_file.filename)[0] + ".svg"),
                 filter='Vector Graphics (*.svg);; Image (*.png)'
             )
         filename = str(filename)
@@ -499,30 +556,33 @@ class TemperatureController(QtCore.QObject):
         if filename != '':
             self.widget.temperature_spectrum_widget.save_graph(ds_filename, us_filename)
 
+    def graph_save_failed(self, filename, error_message):
+        self.widget.show_error_dialog("Couldn't save graph to {}:\n{}".format(filename, error_message), "Save Error")
+
     def update_setting_combobox(self, filename):
         folder = os.path.split(filename)[0]
         self._settings_files_list = []
         self._settings_file_names_list = []
         try:
-            files = os.listdir(folder)
-            files = natsorted(files)
-            for file in files:
-                if file.endswith('.trs') and not file.startswith('.'):
-                    self._settings_files_list.append(file)
-                    name_for_list = file.split('.')[:-1][0]
-                    self._settings_file_names_list.append(name_for_list)
+            with os.scandir(folder) as entries:
+                files = [entry.name for entry in entries
+                         if entry.name.endswith('.trs') and not entry.name.startswith('.')
+                         and entry.is_file()]
+            for file in natsorted(files):
+                self._settings_files_list.append(file)
+                self._settings_file_names_list.append(os.path.splitext(file)[0])
         except:
             pass
         if not len(self._settings_files_list):
             self._settings_files_list.append(filename)
-            name_for_list = filename.split('.')[:-1][0]
+            name_for_list = os.path.splitext(os.path.basename(filename))[0]
             self._settings_file_names_list.append(name_for_list)
         
         self.widget.settings_cb.blockSignals(True)
-        self.widget.settings_cb.clear()
-        self.widget.settings_cb.addItems(self._settings_file_names_list)
+        # replacing the whole list resets the model once instead of inserting the rows one by one
+        self._settings_cb_model.setStringList(self._settings_file_names_list)
 
-        selected_name = os.path.split(filename)[1].split('.')[:-1][0]
+        selected_name = os.path.splitext(os.path.basename(filename))[0]
         ind = self._settings_file_names_list.index(selected_name)
         self.widget.settings_cb.setCurrentIndex(ind)
         self.widget.settings_cb.blockSignals(False)
@@ -547,70 +607,90 @@ class TemperatureController(QtCore.QObject):
 
 
     def data_changed_signal_callback(self):
-        self.widget.roi_widget.plot_img(self.model.current_configuration.data_img)
-        if self.model.current_configuration.data_img_file is not None:
-            if hasattr(self.model.current_configuration.data_img_file,'raw_ccd'):
-                self.widget.roi_widget.plot_raw_ccd(self.model.current_configuration.data_img_file.raw_ccd)
-        if self.model.current_configuration.x_calibration is not None and self.model.current_configuration.data_img is not None:
-            wl_calibration = self.model.current_configuration.x_calibration
-            #x_dim = self.model.current_configuration.data_img.shape[1]
-            x = round(wl_calibration[0], 3)
-            y = 0
-            w = round(wl_calibration[-1]-wl_calibration[0],3)
-            h = self.model.current_configuration.data_img.shape[0]
-            
-            self.widget.roi_widget.img_widget.set_wavelength_calibration((x,y,w,h))
-        rois = self.model.current_configuration.get_roi_data_list()
-        self.widget.roi_widget.set_rois(self.model.current_configuration.get_roi_data_list())
-        self.widget.roi_widget.set_wl_range(self.model.current_configuration.wl_range)
+        with self.batched_ui_update():
+            self.widget.roi_widget.plot_img(self.model.current_configuration.data_img)
+            if self.model.current_configuration.data_img_file is not None:
+                if hasattr(self.model.current_configuration.data_img_file,'raw_ccd'):
+                    self.widget.roi_widget.plot_raw_ccd(self.model.current_configuration.data_img_file.raw_ccd)
+            if self.model.current_configuration.x_calibration is not None and self.model.current_configuration.data_img is not None:
+                wl_calibration = self.model.current_configuration.x_calibration
+                #x_dim = self.model.current_configuration.data_img.shape[1]
+                h = self.model.current_configuration.data_img.shape[0]
+                # the calibration array is only replaced when a new calibration is loaded, the cached entry keeps a
+                # reference to it, so the identity check can not match a different array
+                cached_wl_calibration, cached_h, rectangle = self._wl_calibration_rectangle
+                if wl_calibration is not cached_wl_calibration or h != cached_h:
+                    x = round(wl_calibration[0], 3)
+                    y = 0
+                    w = round(wl_calibration[-1]-wl_calibration[0],3)
+                    rectangle = (x,y,w,h)
+                    self._wl_calibration_rectangle = (wl_calibration, h, rectangle)
+
+                self.widget.roi_widget.img_widget.set_wavelength_calibration(rectangle)
+            rois = self.model.current_configuration.get_roi_data_list()
+            self.widget.roi_widget.set_rois(self.model.current_configuration.get_roi_data_list())
+            self.widget.roi_widget.set_wl_range(self.model.current_configuration.wl_range)
         
-        # update exp data widget
-        #####################################
+            # update exp data widget
+            #####################################
 
-        if self.model.current_configuration.data_img_file is not None:
-            if hasattr(self.model.current_configuration.data_img_file, 'filename') :
-                self.model.current_configuration.data_img_file.filename = os.path.normpath(self.model.current_configuration.data_img_file.filename)
-                fname = os.path.split(self.model.current_configuration.data_img_file.filename)[-1]
-                dirname = os.path.sep.join(os.path.dirname(self.model.current_configuration.data_img_file.filename).split(os.path.sep)[-2:])
-                joined = os.path.join(dirname,fname)
-                self.widget.filename_lbl.setText(joined)
-
-                #self.widget.dirname_lbl.setText(dirname)
-            else:
-                self.widget.filename_lbl.setText('')
-                #self.widget.dirname_lbl.setText('')
+            if self.model.current_configuration.data_img_file is not None:
+                if hasattr(self.model.current_configuration.data_img_file, 'filename') :
+                    normpath, joined = _file_label(self.model.current_configuration.data_img_file.filename)
+                    self.model.current_configuration.data_img_file.filename = normpath
+                    self.widget.filename_lbl.setText(joined)
 
-            if self.model.current_configuration.data_img_file.num_frames > 1:
-                self.widget.frame_widget.setVisible(True)
-                self.widget.temperature_spectrum_widget.show_time_lapse_plot(True)
-            else:
-                self.widget.frame_widget.setVisible(False)
-                self.widget.temperature_spectrum_widget.show_time_lapse_plot(False)
+                    #self.widget.dirname_lbl.setText(dirname)
+                else:
+                    self.widget.filename_lbl.setText('')
+                    #self.widget.dirname_lbl.setText('')
+
+                if self.model.current_configuration.data_img_file.num_frames > 1:
+                    self.widget.frame_widget.setVisible(True)
+                    self.widget.temperature_spectrum_widget.show_time_lapse_plot(True)
+                else:
+                    self.widget.frame_widget.setVisible(False)
+                    self.widget.temperature_spectrum_widget.show_time_lapse_plot(False)
            
-            self.set_frame_text(str(self.model.current_configuration.current_frame + 1))
+                self.set_frame_text(str(self.model.current_configuration.current_frame + 1))
        
             
-            self.widget.graph_info_lbl.setText(self.model.current_configuration.file_info)
-        else:
-            self.widget.filename_lbl.setText('Select File...')
-            #self.widget.dirname_lbl.setText('')
-            self.widget.frame_widget.setVisible(False)
-            self.widget.temperature_spectrum_widget.show_time_lapse_plot(False)
+                self.widget.graph_info_lbl.setText(self.model.current_configuration.file_info)
+            else:
+                self.widget.filename_lbl.setText('Select File...')
+                #self.widget.dirname_lbl.setText('')
+                self.widget.frame_widget.setVisible(False)
+                self.widget.temperature_spectrum_widget.show_time_lapse_plot(False)
 
-        self.use_background_update()
+            self.use_background_update()
 
-        self.ds_calculations_changed()
-        self.us_calculations_changed()
+            self.ds_calculations_changed()
+            self.us_calculations_changed()
 
-        self.widget.temperature_spectrum_widget.normalize_range()
+            self.widget.temperature_spectrum_widget.normalize_range()
         
-        mtime = self.model.current_configuration.mtime
-        self.widget.mtime.setText('Timestamp: '+ str(mtime))
+            mtime = self.model.current_configuration.mtime
+            self.widget.mtime.setText('Timestamp: '+ str(mtime))
 
-        settings_filename = self.model.current_configuration.setting_filename
-        if settings_filename:
-            self.update_setting_combobox(settings_filename)
+            settings_filename = self.model.current_configuration.setting_filename
+            if settings_filename:
+                self.update_setting_combobox(settings_filename)
         
+    @contextmanager
+    def batched_ui_update(self):
+        """
+        Disables repainting of the temperature widget while the body is executed, all changes are then painted at
+        once. Can be nested, only the outermost call enables the updates again.
+        """
+        if not self.widget.updatesEnabled():
+            yield
+            return
+        self.widget.setUpdatesEnabled(False)
+        try:
+            yield
+        finally:
+            self.widget.setUpdatesEnabled(True)
+
     def set_frame_text(self, txt):
         self.widget.frame_num_txt.blockSignals(True)
         self.widget.frame_num_txt.setText(txt)
@@ -618,111 +698,117 @@ class TemperatureController(QtCore.QObject):
         self.widget.frame_num_txt.blockSignals(False)
 
     def ds_calculations_changed(self):
-        curr_frame = self.model.current_configuration.current_frame
-        ds_fit_ok = True
-        if hasattr(self.model, 'ds_temperatures'):
-            ds_temperatures = self.model.current_configuration.ds_temperatures
-            if curr_frame>=0 and curr_frame<len(ds_temperatures):
-                ds_fit_ok = ds_temperatures[curr_frame] > 0
+        with self.batched_ui_update():
+            curr_frame = self.model.current_configuration.current_frame
+            ds_fit_ok = True
+            if hasattr(self.model, 'ds_temperatures'):
+                ds_temperatures = self.model.current_configuration.ds_temperatures
+                if curr_frame>=0 and curr_frame<len(ds_temperatures):
+                    ds_fit_ok = ds_temperatures[curr_frame] > 0
       
 
-        if self.model.current_configuration.ds_calibration_filename is not None:
-            self.widget.ds_calibration_filename_lbl.setText(str(os.path.basename(self.model.current_configuration.ds_calibration_filename)))
-        else:
-            self.widget.ds_calibration_filename_lbl.setText('Select File...')
+            if self.model.current_configuration.ds_calibration_filename is not None:
+                self.widget.ds_calibration_filename_lbl.setText(str(os.path.basename(self.model.current_configuration.ds_calibration_filename)))
+            else:
+                self.widget.ds_calibration_filename_lbl.setText('Select File...')
 
-        self.widget.ds_standard_filename_lbl.setText(str(os.path.basename(self.model.current_configuration.ds_standard_filename)))
-        self.widget.ds_standard_rb.setChecked(self.model.current_configuration.ds_temperature_model.calibration_parameter.modus)
-        self.widget.ds_temperature_txt.setText(str(self.model.current_configuration.ds_temperature_model.calibration_parameter.temperature))
+            self.widget.ds_standard_filename_lbl.setText(str(os.path.basename(self.model.current_configuration.ds_standard_filename)))
+            self.widget.ds_standard_rb.setChecked(self.model.current_configuration.ds_temperature_model.calibration_parameter.modus)
+            ds_calibration_temperature = str(self.model.current_configuration.ds_temperature_model.calibration_parameter.temperature)
+            if self.widget.ds_temperature_txt.text() != ds_calibration_temperature:
+                self.widget.ds_temperature_txt.setText(ds_calibration_temperature)
 
-        if len(self.model.current_configuration.ds_corrected_spectrum):
-            ds_plot_spectrum = self.model.current_configuration.ds_corrected_spectrum
-        else:
-            ds_plot_spectrum = self.model.current_configuration.ds_data_spectrum
+            if len(self.model.current_configuration.ds_corrected_spectrum):
+                ds_plot_spectrum = self.model.current_configuration.ds_corrected_spectrum
+            else:
+                ds_plot_spectrum = self.model.current_configuration.ds_data_spectrum
 
-        if self.widget.two_color_btn.isChecked() and self.model.current_configuration.ds_temperature != 0 and ds_fit_ok:
-            lam, temp = self.model.current_configuration.ds_2_color_temp
-            self.widget.temperature_spectrum_widget.plot_ds_data(lam, temp)
-        else:
-            self.widget.temperature_spectrum_widget.plot_ds_data(*ds_plot_spectrum.data,mask=ds_plot_spectrum.mask)
-            self.widget.temperature_spectrum_widget.plot_ds_masked_data(*ds_plot_spectrum.data,mask=ds_plot_spectrum.mask)
-        if self.model.current_configuration.ds_temperature != 0 and ds_fit_ok and self.model.current_configuration.ds_temperature_error <= self.model.current_configuration.error_limit:
-            if not self.widget.two_color_btn.isChecked() :
-                self.widget.temperature_spectrum_widget.plot_ds_fit(*self.model.current_configuration.ds_fit_spectrum.data)
+            if self.widget.two_color_btn.isChecked() and self.model.current_configuration.ds_temperature != 0 and ds_fit_ok:
+                lam, temp = self.model.current_configuration.ds_2_color_temp
+                self.widget.temperature_spectrum_widget.plot_ds_data(lam, temp)
             else:
-                self.widget.temperature_spectrum_widget.plot_ds_fit([],[])
-            self.widget.temperature_spectrum_widget.update_ds_temperature_txt(self.model.current_configuration.ds_temperature,
-                                                           self.model.current_configuration.ds_temperature_error)
+                self.widget.temperature_spectrum_widget.plot_ds_data(*ds_plot_spectrum.data,mask=ds_plot_spectrum.mask)
+                self.widget.temperature_spectrum_widget.plot_ds_masked_data(*ds_plot_spectrum.data,mask=ds_plot_spectrum.mask)
+            if self.model.current_configuration.ds_temperature != 0 and ds_fit_ok and self.model.current_configuration.ds_temperature_error <= self.model.current_configuration.error_limit:
+                if not self.widget.two_color_btn.isChecked() :
+                    self.widget.temperature_spectrum_widget.plot_ds_fit(*self.model.current_configuration.ds_fit_spectrum.data)
+                else:
+                    self.widget.temperature_spectrum_widget.plot_ds_fit([],[])
+                self.widget.temperature_spectrum_widget.update_ds_temperature_txt(self.model.current_configuration.ds_temperature,
+                                                               self.model.current_configuration.ds_temperature_error)
            
             
-        else:
-            self.widget.temperature_spectrum_widget.plot_ds_fit([],[])
-            self.widget.temperature_spectrum_widget.update_ds_temperature_txt(0,
-                                                           0)
-        self.widget.roi_widget.specra_widget.plot_ds_data(*self.model.current_configuration.ds_temperature_model.data_spectrum.data)
+            else:
+                self.widget.temperature_spectrum_widget.plot_ds_fit([],[])
+                self.widget.temperature_spectrum_widget.update_ds_temperature_txt(0,
+                                                               0)
+            self.widget.roi_widget.specra_widget.plot_ds_data(*self.model.current_configuration.ds_temperature_model.data_spectrum.data)
 
         
-        self.widget.temperature_spectrum_widget.update_ds_roi_max_txt(self.model.current_configuration.ds_temperature_model.data_roi_max)
+            self.widget.temperature_spectrum_widget.update_ds_roi_max_txt(self.model.current_configuration.ds_temperature_model.data_roi_max)
 
-        if self.widget.connect_to_epics_cb.isChecked():
-            if self.epics_available:
-                ds_temp_pv = eps.epics_settings['ds_last_temp']
-                if ds_temp_pv is not None and not ds_temp_pv == '' and not ds_temp_pv == 'None':
-                    caput(ds_temp_pv, self.model.current_configuration.ds_temperature)
+            if self.widget.connect_to_epics_cb.isChecked():
+                if self.epics_available:
+                    ds_temp_pv = eps.epics_settings['ds_last_temp']
+                    if ds_temp_pv is not None and not ds_temp_pv == '' and not ds_temp_pv == 'None':
+                        self.get_pv(ds_temp_pv).put(self.model.current_configuration.ds_temperature, wait=False)
                 
 
     def us_calculations_changed(self):
-        curr_frame = self.model.current_configuration.current_frame
-        us_fit_ok = True
-        if hasattr(self.model, 'us_temperatures'):
-            us_temperatures = self.model.current_configuration.us_temperatures
-            if curr_frame>=0 and curr_frame<len(us_temperatures):
-                us_fit_ok = us_temperatures[curr_frame] > 0
+        with self.batched_ui_update():
+            curr_frame = self.model.current_configuration.current_frame
+            us_fit_ok = True
+            if hasattr(self.model, 'us_temperatures'):
+                us_temperatures = self.model.current_configuration.us_temperatures
+                if curr_frame>=0 and curr_frame<len(us_temperatures):
+                    us_fit_ok = us_temperatures[curr_frame] > 0
  
-        if self.model.current_configuration.us_calibration_filename is not None:
-            self.widget.us_calibration_filename_lbl.setText(str(os.path.basename(self.model.current_configuration.us_calibration_filename)))
-        else:
-            self.widget.us_calibration_filename_lbl.setText('Select File...')
+            if self.model.current_configuration.us_calibration_filename is not None:
+                self.widget.us_calibration_filename_lbl.setText(str(os.path.basename(self.model.current_configuration.us_calibration_filename)))
+            else:
+                self.widget.us_calibration_filename_lbl.setText('Select File...')
 
-        self.widget.us_standard_filename_lbl.setText(str(os.path.basename(self.model.current_configuration.us_standard_filename)))
-        self.widget.us_standard_rb.setChecked(self.model.current_configuration.us_temperature_model.calibration_parameter.modus)
-        self.widget.us_temperature_txt.setText(str(self.model.current_configuration.us_temperature_model.calibration_parameter.temperature))
+            self.widget.us_standard_filename_lbl.setText(str(os.path.basename(self.model.current_configuration.us_standard_filename)))
+            self.widget.us_standard_rb.setChecked(self.model.current_configuration.us_temperature_model.calibration_parameter.modus)
+            us_calibration_temperature = str(self.model.current_configuration.us_temperature_model.calibration_parameter.temperature)
+            if self.widget.us_temperature_txt.text() != us_calibration_temperature:
+                self.widget.us_temperature_txt.setText(us_calibration_temperature)
 
-        if len(self.model.current_configuration.us_corrected_spectrum):
-            us_plot_spectrum = self.model.current_configuration.us_corrected_spectrum
-        else:
-            us_plot_spectrum = self.model.current_configuration.us_data_spectrum
-        if self.widget.two_color_btn.isChecked() and self.model.current_configuration.us_temperature != 0 and us_fit_ok:
-            lam, temp = self.model.current_configuration.us_2_color_temp
-            self.widget.temperature_spectrum_widget.plot_us_data(lam, temp)
-        else:
-            self.widget.temperature_spectrum_widget.plot_us_data(*us_plot_spectrum.data,mask=us_plot_spectrum.mask)
-            self.widget.temperature_spectrum_widget.plot_us_masked_data(*us_plot_spectrum.data,mask=us_plot_spectrum.mask)
-        if self.model.current_configuration.us_temperature != 0 and us_fit_ok and self.model.current_configuration.us_temperature_error <= self.model.current_configuration.error_limit:
-            if not self.widget.two_color_btn.isChecked() :
-                
-                self.widget.temperature_spectrum_widget.plot_us_fit(*self.model.current_configuration.us_fit_spectrum.data)
+            if len(self.model.current_configuration.us_corrected_spectrum):
+                us_plot_spectrum = self.model.current_configuration.us_corrected_spectrum
             else:
-                self.widget.temperature_spectrum_widget.plot_us_fit([],[])
-            self.widget.temperature_spectrum_widget.update_us_temperature_txt(self.model.current_configuration.us_temperature,
-                                                           self.model.current_configuration.us_temperature_error)
+                us_plot_spectrum = self.model.current_configuration.us_data_spectrum
+            if self.widget.two_color_btn.isChecked() and self.model.current_configuration.us_temperature != 0 and us_fit_ok:
+                lam, temp = self.model.current_configuration.us_2_color_temp
+                self.widget.temperature_spectrum_widget.plot_us_data(lam, temp)
+            else:
+                self.widget.temperature_spectrum_widget.plot_us_data(*us_plot_spectrum.data,mask=us_plot_spectrum.mask)
+                self.widget.temperature_spectrum_widget.plot_us_masked_data(*us_plot_spectrum.data,mask=us_plot_spectrum.mask)
+            if self.model.current_configuration.us_temperature != 0 and us_fit_ok and self.model.current_configuration.us_temperature_error <= self.model.current_configuration.error_limit:
+                if not self.widget.two_color_btn.isChecked() :
+                
+                    self.widget.temperature_spectrum_widget.plot_us_fit(*self.model.current_configuration.us_fit_spectrum.data)
+                else:
+                    self.widget.temperature_spectrum_widget.plot_us_fit([],[])
+                self.widget.temperature_spectrum_widget.update_us_temperature_txt(self.model.current_configuration.us_temperature,
+                                                               self.model.current_configuration.us_temperature_error)
             
-            lam, temp = self.model.current_configuration.us_2_color_temp
+                lam, temp = self.model.current_configuration.us_2_color_temp
 
-        else:
-            self.widget.temperature_spectrum_widget.plot_us_fit([],[])
-            self.widget.temperature_spectrum_widget.update_us_temperature_txt(0,
-                                                           0)
-        self.widget.roi_widget.specra_widget.plot_us_data(*self.model.current_configuration.us_temperature_model.data_spectrum.data)
+            else:
+                self.widget.temperature_spectrum_widget.plot_us_fit([],[])
+                self.widget.temperature_spectrum_widget.update_us_temperature_txt(0,
+                                                               0)
+            self.widget.roi_widget.specra_widget.plot_us_data(*self.model.current_configuration.us_temperature_model.data_spectrum.data)
 
         
-        self.widget.temperature_spectrum_widget.update_us_roi_max_txt(self.model.current_configuration.us_temperature_model.data_roi_max)
+            self.widget.temperature_spectrum_widget.update_us_roi_max_txt(self.model.current_configuration.us_temperature_model.data_roi_max)
 
-        if self.widget.connect_to_epics_cb.isChecked():
-            if self.epics_available:
-                us_temp_pv = eps.epics_settings['us_last_temp']
-                if us_temp_pv is not None and not us_temp_pv =='' and not us_temp_pv == 'None':
-                    caput(us_temp_pv, self.model.current_configuration.us_temperature)
+            if self.widget.connect_to_epics_cb.isChecked():
+                if self.epics_available:
+                    us_temp_pv = eps.epics_settings['us_last_temp']
+                    if us_temp_pv is not None and not us_temp_pv =='' and not us_temp_pv == 'None':
+                        self.get_pv(us_temp_pv).put(self.model.current_configuration.us_temperature, wait=False)
                 
 
     def update_time_lapse(self):
@@ -741,7 +827,7 @@ class TemperatureController(QtCore.QObject):
                 out = np.mean(ds_t), np.std(ds_t)
             ds_temperature_plot_data = ds_temperature_arr[:]
             ds_temperature_plot_data[~select_ds] = 0
-        self.widget.temperature_spectrum_widget.plot_ds_time_lapse(range(1, len(ds_temperature_plot_data)+1), ds_temperature_plot_data)
+        self.widget.temperature_spectrum_widget.plot_ds_time_lapse(np.arange(1, len(ds_temperature_plot_data)+1), ds_temperature_plot_data)
         self.widget.temperature_spectrum_widget.update_time_lapse_ds_temperature_txt(*out)
             
         out = np.nan, np.nan
@@ -754,13 +840,20 @@ class TemperatureController(QtCore.QObject):
                 out = np.mean(us_t), np.std(us_t)
             us_temperature_plot_data = us_temperature_arr[:]
             us_temperature_plot_data[~select_us] = 0
-        self.widget.temperature_spectrum_widget.plot_us_time_lapse(range(1, len(us_temperature_plot_data)+1), us_temperature_plot_data)
+        self.widget.temperature_spectrum_widget.plot_us_time_lapse(np.arange(1, len(us_temperature_plot_data)+1), us_temperature_plot_data)
         self.widget.temperature_spectrum_widget.update_time_lapse_us_temperature_txt(*out)
 
-        if len(ds_t) or len(us_t):
-            conc = np.concatenate((ds_t, us_t))
-            conc = conc[~np.isnan(conc).all()]
-            out = np.mean(conc), np.std(conc)
+        n_ds, n_us = len(ds_t), len(us_t)
+        if n_ds or n_us:
+            # pooled mean and (population) standard deviation of both sides, without concatenating the arrays
+            m_ds = ds_t.mean() if n_ds else 0.
+            m_us = us_t.mean() if n_us else 0.
+            v_ds = ds_t.var() if n_ds else 0.
+            v_us = us_t.var() if n_us else 0.
+            n = n_ds + n_us
+            m = (n_ds * m_ds + n_us * m_us) / n
+            v = (n_ds * (v_ds + (m_ds - m) ** 2) + n_us * (v_us + (m_us - m) ** 2)) / n
+            out = m, np.sqrt(v)
         else:
             out = np.nan, np.nan
         self.widget.temperature_spectrum_widget.update_time_lapse_combined_temperature_txt(*out )
@@ -771,9 +864,15 @@ class TemperatureController(QtCore.QObject):
     
 
     def widget_rois_changed(self, roi_list):
-        if self.model.current_configuration.has_data():
-            
-            
+        # refitting both sides takes longer than the interval between drag events, so they are coalesced
+        self._pending_roi_list = roi_list
+        if not self.roi_update_timer.isActive():
+            self.roi_update_timer.start()
+
+    def update_rois(self):
+        roi_list = self._pending_roi_list
+        self._pending_roi_list = None
+        if roi_list is not None and self.model.current_configuration.has_data():
             self.model.current_configuration.set_rois(roi_list)
             wl_range = self.model.current_configuration.wl_range
             self.widget.roi_widget.set_wl_range(wl_range)
@@ -781,26 +880,38 @@ class TemperatureController(QtCore.QObject):
 
     def widget_wl_range_changed_callback(self, wl_range):
         if self.model.current_configuration.has_data():
+            previous_rois = self.model.current_configuration.get_roi_data_list()
             self.model.current_configuration.wl_range = wl_range
             rois = self.model.current_configuration.get_roi_data_list()
-            self.model.current_configuration.set_rois(rois)
-            self.widget.roi_widget.set_rois(rois)
+            # set_rois refits both sides 4 times, skip it if the new range maps onto the same pixels
+            if rois != previous_rois:
+                self.model.current_configuration.set_rois(rois)
+                self.widget.roi_widget.set_rois(rois)
 
     def graph_mouse_moved(self, x, y):
         self.widget.graph_mouse_pos_lbl.setText("X: {:8.2f}  Y: {:8.2f}".format(x, y))
 
     def roi_mouse_moved(self, x, y):
-        x = int(np.floor(x))
-        y = int(np.floor(y))
+        # the label is updated at most once per roi_mouse_timer interval with the latest position
+        self._roi_mouse_pos = (x, y)
+        if not self.roi_mouse_timer.isActive():
+            self.roi_mouse_timer.start()
+
+    def update_roi_mouse_pos(self):
+        x, y = self._roi_mouse_pos
+        if x < 0 or y < 0:
+            return
+        x = int(x)
+        y = int(y)
         try:
-            
-            if self.model.current_configuration.data_img is not None:
-                s = self.model.current_configuration.data_img.shape
-                if int(y)< s[0] and int(x)< s[1] and int(x) >= 0 and int(y) >= 0:
+            data_img = self.model.current_configuration.data_img
+            if data_img is not None:
+                s = data_img.shape
+                if y < s[0] and x < s[1]:
                     self.widget.roi_widget.pos_lbl.setText("X: {:5.0f}  Y: {:5.0f}    Int: {:6.0f}    Wavelength: {:5.2f} nm".
                                                     format(x, y,
-                                                            self.model.current_configuration.data_img[int(y), int(x)],
-                                                            self.model.current_configuration.data_img_file.x_calibration[int(x)]))
+                                                            data_img[y, x],
+                                                            self.model.current_configuration.data_img_file.x_calibration[x]))
         except (IndexError, TypeError):
             pass
 
@@ -813,7 +924,7 @@ class TemperatureController(QtCore.QObject):
         for conf in self.model.configurations:
             if not conf.setting_filename is None:
                 set_fname =  os.path.split(conf.setting_filename)[-1]
-                name_for_list = set_fname.split('.')[:-1][0]
+                name_for_list = os.path.splitext(set_fname)[0]
                 conf_dict = {}
                 if conf.data_img_file:
                     data_file = conf.data_img_file.filename
@@ -870,7 +981,8 @@ class TemperatureController(QtCore.QObject):
                 conf = conf_list[n+1]
                 self.load_conf_settings(conf)
 
-            configuration_ind = settings.get("temperature configuration_ind", 0)
+            # ini/plist backends return the stored index as a string
+            configuration_ind = int(settings.get("temperature configuration_ind", 0))
             self.model.select_configuration(configuration_ind)
 
         try_epics = str.lower(str(settings.get("temperature epics connected") )) == 'true'
@@ -918,6 +1030,16 @@ class TemperatureController(QtCore.QObject):
         
         
 
+    def get_pv(self, pv_name):
+        """
+        Returns a connected PV object for pv_name, it is created on first use and then reused.
+        """
+        pv = self._pvs.get(pv_name)
+        if pv is None:
+            pv = self._pvs[pv_name] = PV(pv_name, auto_monitor=False)
+            pv.wait_for_connection(timeout=1.0)
+        return pv
+
     def check_pv(self, pv_name):
         try:
             value = caget(pv_name, timeout=0.2)  # Short timeout for quick response
@@ -957,7 +1079,7 @@ class TemperatureController(QtCore.QObject):
 
     def temperature_folder_changed_emitted(self):
         if  self.epics_available:
-            self._exp_working_dir = caget(eps.epics_settings['T_folder'], as_string=True)
+            self._exp_working_dir = self.get_pv(eps.epics_settings['T_folder']).get(as_string=True)
             self._directory_watcher.path = self._exp_working_dir
 
     def epics_datalog_file_changed_emitted(self, filename):
@@ -37,7 +37,6 @@ from .helper.HelperModule import get_partial_index, get_partial_value
 
 from .TemperatureModel import LOG_HEADER, T_LOG_FILE
 
-import csv
 from collections import deque
 from typing import List
 
@@ -71,56 +70,46 @@ class DatalogModel(QtCore.QObject):
         super().__init__()
 
         self.filename = None
-        self.data_records = []
+        # one (T_DS, T_US) entry per log line, the array is only built when the temperatures are requested
+        self.temperature_records = []
 
     def clear_log(self):
-        self.data_records= []
+        self.temperature_records = []
 
     def get_temperatures(self):
-        
-        data_records = self.data_records
-        T_DS = np.zeros(len(data_records))
-        T_US = np.zeros(len(data_records))
-        for i, record in enumerate(data_records):
-            tds = record.T_DS
-            tus = record.T_US
-            
-            T_DS[i] = tds
-            T_US[i] = tus
+        temperatures = np.array(self.temperature_records, dtype=np.float32).reshape((-1, 2))
+        T_DS = temperatures[:, 0]
+        T_US = temperatures[:, 1]
         return T_DS, T_US
        
     
     def add_record(self, record):
         data_record = DataRecord(**record)
-        self.data_records.append(data_record)
+        self.temperature_records.append((data_record.T_DS, data_record.T_US))
     
     def load_last_n_records(self, file_path: str, n: int):
-        # Using deque to keep only the last n lines in memory
-        last_n_lines = deque(maxlen=n)
-        
+        """
+        Reads the T_DS and T_US columns of the last n entries of a temperature log file.
+        Header lines (starting with '# File') are skipped, also when they were appended in the middle of the file.
+        :param file_path: path of the log file
+        :param n: number of lines to read from the end of the file
+        :return: float32 numpy array with shape (entries, 2), columns are T_DS and T_US
+        """
         with open(file_path, 'r') as file:
-            # Skip the header line
             header = file.readline()
-            
-            # Read the file line by line from the end
-            for line in reversed(list(file)):
-                last_n_lines.appendleft(line)
-                if len(last_n_lines) == n:
-                    break
-        
-        # Parse the collected lines into DataRecord objects
-        data_records = []
-        reader = csv.DictReader(last_n_lines, delimiter='\t', fieldnames=header.strip().split('\t'))
-        next(reader, None)  # Skip the header line in deque
-        for row in reader:
-            if row['Path'] != 'Path':
-                headings = list(row.keys())
-
-                all_strings = all(isinstance(item, str) for item in headings)
-                if all_strings:
-                    record = DataRecord(**row)
-                    data_records.append(record)
-                else:
-                    continue
-        
-        return data_records
\ No newline at end of file
+            # Using deque to keep only the last n lines in memory
+            last_n_lines = deque(file, maxlen=n)
+        # '#' is not used as comment character, it can be part of file names and paths
+        lines = [line for line in last_n_lines if not line.startswith('# File')]
+
+        fieldnames = header.strip().split('\t')
+        try:
+            usecols = (fieldnames.index('T_DS'), fieldnames.index('T_US'))
+        except ValueError:
+            return np.empty((0, 2), dtype=np.float32)
+
+        with warnings.catch_warnings():
+            # np.loadtxt warns if the log only contains header lines
+            warnings.simplefilter('ignore', UserWarning)
+            return np.loadtxt(lines, delimiter='\t', comments=None, usecols=usecols,
+                              dtype=np.float32, ndmin=2)
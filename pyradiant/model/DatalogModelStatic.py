@@ -140,14 +140,9 @@ class StaticRecordManager:
     def get_temperatures(self, n=None):
         static_records =  self.get_last_n_records(n)
         data_records = static_records
-        T_DS = np.zeros(len(data_records))
-        T_US = np.zeros(len(data_records))
-        for i, record in enumerate(data_records):
-            tds = record.T_DS
-            tus = record.T_US
-            
-            T_DS[i] = tds
-            T_US[i] = tus
+        # contiguous float32, same as DatalogModel, halves the memory walked by masking and plotting
+        T_DS = np.fromiter((record.T_DS for record in data_records), dtype=np.float32, count=len(data_records))
+        T_US = np.fromiter((record.T_US for record in data_records), dtype=np.float32, count=len(data_records))
         return T_DS, T_US
 
     def __repr__(self):
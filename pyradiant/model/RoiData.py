@@ -19,6 +19,8 @@
 
 import numpy as np
 
+from .helper.numeric import column_stats, column_stats_bg
+
 
 class Roi():
     def __init__(self, limits):
@@ -75,6 +77,8 @@ class RoiDataManager():
         self.x_calibration = []
         self._img_dimensions_list = []
         self._rois_list = []
+        # image dimension -> index into the lists above, avoids scanning them on every get_roi
+        self._dimension_inds = {}
         self._num = 0
         self._current = None
 
@@ -91,15 +95,13 @@ class RoiDataManager():
         else:
             self._img_dimensions_list.append(img_dimension)
             self._rois_list.append(rois)
+            self._dimension_inds[tuple(img_dimension)] = self._num
             self._num += 1
 
     def _get_dimension_ind(self, img_dimension):
-        for ind in range(self._num):
-            if self._img_dimensions_list[ind] == img_dimension:
-                self._current = ind
-                return ind
-        self._current = None
-        return None
+        ind = self._dimension_inds.get(tuple(img_dimension))
+        self._current = ind
+        return ind
 
     def get_rois(self, img_dimension):
         """
@@ -112,8 +114,9 @@ class RoiDataManager():
         if img_dimension is None:
             img_dimension = (1, 1)
 
-        if self._exists(img_dimension):
-            return self._rois_list[self._get_dimension_ind(img_dimension)]
+        ind = self._get_dimension_ind(img_dimension)
+        if ind is not None:
+            return self._rois_list[ind]
         else:
             rois = []
             part_height = img_dimension[1] / (2.0 * self.roi_num + 1.0)
@@ -132,11 +135,7 @@ class RoiDataManager():
         return self.get_rois(img_dimension)[index]
 
     def set_roi(self, index, img_dimension, limits):
-        if self._exists(img_dimension):
-            self._rois_list[self._get_dimension_ind(img_dimension)][index] = Roi(limits)
-        else:
-            self.get_rois(img_dimension)
-            self.set_roi(index, img_dimension, limits)
+        self.get_rois(img_dimension)[index] = Roi(limits)
 
 
 def validate_roi(roi):
@@ -163,6 +162,24 @@ def get_roi_sum(img, roi):
         print('failed')
     return np.sum(roi_img, 0) / roi_img.shape[0]
 
+def get_roi_stats(img, roi, limit=65534, roi_bg=None):
+    """
+    Averages up all pixels in vertical direction of the ROI and in the same pass finds the columns which are not
+    saturated and the maximum intensity
+    :param img: 2d image array
+    :param roi: the region of Interest
+    :type roi: ROI
+    :param limit: columns with any pixel above limit are considered saturated
+    :param roi_bg: optional background ROI with the same x range, its average is subtracted from the ROI average
+    :type roi_bg: ROI
+    :return: averaged 1-dimensional numpy array, boolean array of columns within limit, maximum of the ROI
+    """
+    roi = validate_roi(roi)
+    if roi_bg is None:
+        return column_stats(get_roi_img(img, roi), limit)
+    roi_bg = validate_roi(roi_bg)
+    return column_stats_bg(get_roi_img(img, roi), get_roi_img(img, roi_bg), limit)
+
 def get_roi_img(img, roi):
     roi_img = img[int(roi.y_min):int(roi.y_max) + 1, int(roi.x_min):int(roi.x_max) + 1]
     return roi_img
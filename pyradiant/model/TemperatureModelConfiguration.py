@@ -27,21 +27,80 @@ from scipy.optimize import curve_fit
 import h5py
 import math
 import datetime
-import time
+from concurrent.futures import ThreadPoolExecutor
 from .data_models.DataModel import DataModel
 from .Spectrum import Spectrum
-from .RoiData import RoiDataManager, Roi, get_roi_max, get_roi_sum, get_roi_img
+from .RoiData import RoiDataManager, Roi, get_roi_sum, get_roi_stats
 from .data_models.SpeFile import SpeFile
 from .data_models.H5File import H5File
 from .helper import FileNameIterator
-from .radiation import fit_linear, wien_pre_transform, m_to_T, m_b_wien
-from .helper.HelperModule import get_partial_index, get_partial_value
+from .radiation import fit_linear, wien_pre_transform, wien_wavelength_terms, m_to_T, m_b_wien
+from .helper.HelperModule import get_partial_index, get_partial_index_sorted, get_partial_value
 from .TwoColor import calculate_2_color
 from .helper.signal import Signal
+from .helper.numeric import NUMBA_INSTALLED
+if NUMBA_INSTALLED:
+    import numba
 
 T_LOG_FILE = 'T_log'
+# log lines are handed to the writer thread in blocks of this many lines, or LOG_FLUSH_DELAY ms after the first one
+LOG_BUFFER_LINES = 64
+LOG_FLUSH_DELAY = 200
 LOG_HEADER = '# File\tFrame\tPath\tT_DS\tT_US\tT_DS_error\tT_US_error\tDetector\tExposure Time [sec]\tGain\tscaling_DS\tscaling_US\tcounts_DS\tcounts_US\n'
 
+LOG_KEYS = LOG_HEADER[:-1].split('\t')
+
+
+def _format_log_temperature(temperature, temperature_error, error_limit):
+    """
+    Formats a fitted temperature and its error for the log file. NaN values are logged as 0, both are logged as 0 if
+    the error is larger than error_limit.
+    """
+    if math.isnan(temperature_error):
+        temperature_error_s = '0'
+    elif temperature_error > error_limit:
+        return '0', '0'
+    else:
+        temperature_error_s = str(int(temperature_error))
+    if math.isnan(temperature):
+        return '0', temperature_error_s
+    return str(int(temperature)), temperature_error_s
+
+
+def _format_log_scaling(scaling):
+    if math.isnan(scaling):
+        return '0'
+    return format(scaling, ".3e")
+
+
+def _write_log_lines(log_file, lines):
+    log_file.write(''.join(lines))
+    log_file.flush()
+
+
+def _clear_log_file(log_file):
+    log_file.truncate(0)
+    log_file.seek(0)
+    log_file.write(LOG_HEADER)
+
+
+def _read_dataset(dset):
+    # read_direct copies straight into a preallocated array, avoiding the slower generic dset[...] path
+    data = np.empty(dset.shape, dtype=dset.dtype)
+    if data.size:
+        dset.read_direct(data)
+    return data
+
+
+def _create_image_dataset(group, img):
+    # image stacks are chunked one frame per chunk, matching how frames are accessed
+    img = np.asarray(img)
+    if img.ndim == 3:
+        chunks = (1, img.shape[1], img.shape[2])
+    else:
+        chunks = True
+    return group.create_dataset('image', data=img, chunks=chunks, compression='lzf', shuffle=True)
+
 
 class TemperatureModelConfiguration(QtCore.QObject):
     
@@ -73,7 +132,8 @@ class TemperatureModelConfiguration(QtCore.QObject):
 
         self.x_calibration = None
 
-        self.temperature_fit_function_str = 'plank'
+        # the Wien linearization is solved in closed form, Planck (curve_fit) can be selected in the gui
+        self.temperature_fit_function_str = 'wien'
 
         self._filename_iterator = FileNameIterator()
 
@@ -91,6 +151,15 @@ class TemperatureModelConfiguration(QtCore.QObject):
         self.error_limit = 200
 
         self.log_callback = None
+        # log lines are written and flushed by a single background thread, which keeps them in order
+        self._log_writer = ThreadPoolExecutor(max_workers=1)
+        # futures of the submitted writes, failed ones are kept until flush_log raises their exception
+        self._log_writes = []
+        self._log_buffer = []
+        self.log_flush_timer = QtCore.QTimer(self)
+        self.log_flush_timer.setSingleShot(True)
+        self.log_flush_timer.setInterval(LOG_FLUSH_DELAY)
+        self.log_flush_timer.timeout.connect(self._write_log_buffer)
 
 
     def set_log_callback(self, callback_method):
@@ -113,13 +182,41 @@ class TemperatureModelConfiguration(QtCore.QObject):
 
     def clear_log(self):
         if self.log_file is not None:
-            self.log_file.truncate(0)
-            self.log_file.seek(0)
-            self.log_file.write(LOG_HEADER)
+            # buffered lines would be truncated right away
+            self._log_buffer = []
+            self.log_flush_timer.stop()
+            self._submit_log_write(_clear_log_file, self.log_file)
             #self.data_changed_emit(self.current_frame)
 
+    def _submit_log_write(self, fn, *args):
+        self._log_writes = [future for future in self._log_writes
+                            if not future.done() or future.exception() is not None]
+        self._log_writes.append(self._log_writer.submit(fn, *args))
+
+    def _write_log_buffer(self):
+        self.log_flush_timer.stop()
+        if self._log_buffer:
+            self._submit_log_write(_write_log_lines, self.log_file, self._log_buffer)
+            self._log_buffer = []
+
+    def flush_log(self):
+        """
+        Blocks until all log lines written so far, including buffered ones, are in the log file.
+        Raises the exception of the first write that failed in the background.
+        """
+        self._write_log_buffer()
+        log_writes = self._log_writes
+        self._log_writes = []
+        # exception() waits for the write to finish
+        exceptions = [future.exception() for future in log_writes]
+        for exception in exceptions:
+            if exception is not None:
+                raise exception
+
     def get_log_file_path(self):
         if self.log_file is not None:
+            # callers read the file, so it has to be complete
+            self.flush_log()
 
             log_file_path = self.log_file.name
             return log_file_path
@@ -221,6 +318,7 @@ class TemperatureModelConfiguration(QtCore.QObject):
             if self.log_file is not None:
                 if hasattr(self.log_file, 'closed'):
                     if not self.log_file.closed:
+                        self.flush_log()
                         self.log_file.close()
             norm_file_path = os.path.normpath(file_path)
             if os.access(norm_file_path, os.W_OK):
@@ -237,61 +335,40 @@ class TemperatureModelConfiguration(QtCore.QObject):
         
     def close_log(self):
         if self.log_file != None:
+            self.flush_log()
             self.log_file. close()
 
   
 
     def write_to_log_file(self, frame):
-        if not math.isnan(self.ds_temperature):
-            ds_temp = str(int(self.ds_temperature))
-        else:
-            ds_temp = '0'
-        if not math.isnan(self.us_temperature):
-            us_temp = str(int(self.us_temperature))
-        else:
-            us_temp = '0'
-
-        if not math.isnan(self.ds_temperature_error):
-            ds_temperature_error = str(int(self.ds_temperature_error))
-            if self.ds_temperature_error > self.error_limit:
-                ds_temp= '0'
-                ds_temperature_error = '0'
-        else:
-            ds_temperature_error = '0'
-        if not math.isnan(self.us_temperature_error):
-            us_temperature_error = str(int(self.us_temperature_error))
-            if self.us_temperature_error > self.error_limit:
-                us_temp= '0'
-                us_temperature_error = '0'
-        else:
-            us_temperature_error = '0'
-
-        if not math.isnan(self.ds_scaling):
-            ds_scaling = format(self.ds_scaling, ".3e")
-        else:
-            ds_scaling = '0'
-        if not math.isnan(self.us_scaling):
-            us_scaling = format(self.us_scaling, ".3e")
-        else:
-            us_scaling = '0'    
-        frame_s = str(frame + 1)
-        log_data = (os.path.basename(self.filename), frame_s, os.path.dirname(self.filename), ds_temp, us_temp,
+        ds_model = self.ds_temperature_model
+        us_model = self.us_temperature_model
+        ds_temp, ds_temperature_error = _format_log_temperature(ds_model.temperature, ds_model.temperature_error,
+                                                                self.error_limit)
+        us_temp, us_temperature_error = _format_log_temperature(us_model.temperature, us_model.temperature_error,
+                                                                self.error_limit)
+        data_img_file = self.data_img_file
+        filename = self.filename
+        log_data = (os.path.basename(filename), str(frame + 1), os.path.dirname(filename), ds_temp, us_temp,
                     ds_temperature_error, us_temperature_error,
-                    self.data_img_file.detector, str(self.data_img_file.exposure_time),str(self.data_img_file.gain), 
-                    ds_scaling, us_scaling, 
-                    format(self.ds_data_spectrum.counts, ".3e"), format(self.us_data_spectrum.counts, ".3e"))
+                    data_img_file.detector, str(data_img_file.exposure_time), str(data_img_file.gain),
+                    _format_log_scaling(ds_model.scaling), _format_log_scaling(us_model.scaling),
+                    format(ds_model.data_spectrum.counts, ".3e"), format(us_model.data_spectrum.counts, ".3e"))
         
-        self.log_file.write('\t'.join(log_data) + '\n')
-        self.log_file.flush()
-        # Create a dictionary by zipping keys and values together
-        keys = LOG_HEADER[:-1].split('\t')
-        log_dict = dict(zip(keys, log_data))
+        self._log_buffer.append('\t'.join(log_data) + '\n')
+        if len(self._log_buffer) >= LOG_BUFFER_LINES:
+            self._write_log_buffer()
+        elif not self.log_flush_timer.isActive():
+            self.log_flush_timer.start()
         if self.log_callback is not None:
-            self.log_callback(log_dict)
-        time.sleep(0.01) # may help with not missing writes when batch processing
+            # Create a dictionary by zipping keys and values together
+            self.log_callback(dict(zip(LOG_KEYS, log_data)))
         
 
     def set_temperature_fit_function(self, function_type):
+        # clicking the already checked radio button calls this again, nothing changes then, so nothing is refitted
+        if function_type == self.temperature_fit_function_str:
+            return
         if function_type == 'wien' or function_type == 'plank':
             self.temperature_fit_function_str = function_type
             self._update_temperature_models_data()
@@ -427,16 +504,16 @@ class TemperatureModelConfiguration(QtCore.QObject):
         f.create_group('downstream_calibration')
         ds_group = f['downstream_calibration']
         if self.ds_calibration_img_file is not None:
-            ds_group['image'] = self.ds_calibration_img_file.img
-            ds_group['image'].attrs['filename'] = self.ds_calibration_img_file.filename
-            ds_group['image'].attrs['x_calibration'] = self.ds_calibration_img_file.x_calibration
-            ds_group['image'].attrs['subtract_bg'] = self.use_insitu_data_background
+            ds_image = _create_image_dataset(ds_group, self.ds_calibration_img_file.img)
+            ds_image.attrs.update({'filename': self.ds_calibration_img_file.filename,
+                                   'x_calibration': self.ds_calibration_img_file.x_calibration,
+                                   'subtract_bg': self.use_insitu_data_background})
         else:
             if self.ds_temperature_model.calibration_img is not None:
-                ds_group['image'] = self.ds_temperature_model.calibration_img
-                ds_group['image'].attrs['filename'] = self.ds_calibration_filename
-                ds_group['image'].attrs['x_calibration'] = self.ds_temperature_model._data_img_x_calibration
-                ds_group['image'].attrs['subtract_bg'] = self.use_insitu_data_background
+                ds_image = _create_image_dataset(ds_group, self.ds_temperature_model.calibration_img)
+                ds_image.attrs.update({'filename': self.ds_calibration_filename,
+                                       'x_calibration': self.ds_temperature_model._data_img_x_calibration,
+                                       'subtract_bg': self.use_insitu_data_background})
 
         ds_roi_list =  self.ds_roi.as_list()
         ds_group['roi'] = ds_roi_list
@@ -444,43 +521,65 @@ class TemperatureModelConfiguration(QtCore.QObject):
         ds_group['roi_bg'] = ds_roi_bg_list
         ds_group['modus'] = self.ds_temperature_model.calibration_parameter.modus
         ds_group['temperature'] = self.ds_temperature_model.calibration_parameter.temperature
-        ds_group['standard_spectrum'] = self.ds_temperature_model.calibration_parameter.get_standard_spectrum().data
-        ds_group['standard_spectrum'].attrs['filename'] = \
-            self.ds_temperature_model.calibration_parameter.get_standard_filename()
-        ds_group['standard_spectrum'].attrs['subtract_bg'] = self.use_insitu_calibration_background
+        ds_standard_spectrum = ds_group.create_dataset(
+            'standard_spectrum', data=self.ds_temperature_model.calibration_parameter.get_standard_spectrum().data)
+        ds_standard_spectrum.attrs.update({
+            'filename': self.ds_temperature_model.calibration_parameter.get_standard_filename(),
+            'subtract_bg': self.use_insitu_calibration_background})
 
         f.create_group('upstream_calibration')
         us_group = f['upstream_calibration']
         if self.us_calibration_img_file is not None:
-            us_group['image'] = self.us_calibration_img_file.img
-            us_group['image'].attrs['filename'] = self.us_calibration_img_file.filename
-            us_group['image'].attrs['x_calibration'] = self.us_calibration_img_file.x_calibration
-            us_group['image'].attrs['subtract_bg'] = self.use_insitu_data_background
+            us_image = _create_image_dataset(us_group, self.us_calibration_img_file.img)
+            us_image.attrs.update({'filename': self.us_calibration_img_file.filename,
+                                   'x_calibration': self.us_calibration_img_file.x_calibration,
+                                   'subtract_bg': self.use_insitu_data_background})
         else:
             if self.us_temperature_model.calibration_img is not None:
-                us_group['image'] = self.us_temperature_model.calibration_img
-                us_group['image'].attrs['filename'] = self.us_calibration_filename
-                us_group['image'].attrs['x_calibration'] = self.us_temperature_model._data_img_x_calibration
-                us_group['image'].attrs['subtract_bg'] = self.use_insitu_data_background
+                us_image = _create_image_dataset(us_group, self.us_temperature_model.calibration_img)
+                us_image.attrs.update({'filename': self.us_calibration_filename,
+                                       'x_calibration': self.us_temperature_model._data_img_x_calibration,
+                                       'subtract_bg': self.use_insitu_data_background})
         us_group['roi'] = self.us_roi.as_list()
         us_group['roi_bg'] = self.us_roi_bg.as_list()
         us_group['modus'] = self.us_temperature_model.calibration_parameter.modus
         us_group['temperature'] = self.us_temperature_model.calibration_parameter.temperature
-        us_group['standard_spectrum'] = self.us_temperature_model.calibration_parameter.get_standard_spectrum().data
-        us_group['standard_spectrum'].attrs['filename'] = \
-            self.us_temperature_model.calibration_parameter.get_standard_filename()
-        us_group['standard_spectrum'].attrs['subtract_bg'] = self.use_insitu_calibration_background
+        us_standard_spectrum = us_group.create_dataset(
+            'standard_spectrum', data=self.us_temperature_model.calibration_parameter.get_standard_spectrum().data)
+        us_standard_spectrum.attrs.update({
+            'filename': self.us_temperature_model.calibration_parameter.get_standard_filename(),
+            'subtract_bg': self.use_insitu_calibration_background})
 
         f.close()
 
     
     def load_setting(self, filename):
+        # the roi setters used while reading would refresh the views of each side on their own, the views are
+        # refreshed once by data_changed_emit when everything is loaded
+        self.ds_calculations_changed.blocked = True
+        self.us_calculations_changed.blocked = True
+        try:
+            self._read_setting(filename)
+        finally:
+            self.ds_calculations_changed.blocked = False
+            self.us_calculations_changed.blocked = False
+
+        self.data_changed_emit(self.current_frame)
+
+        self.setting_filename = filename
+
+    def _read_setting(self, filename):
         f = h5py.File(filename, 'r')
         ds_group = f['downstream_calibration']
+        # every item/attrs lookup goes through h5py's object layer, so each one is only done once
+        ds_standard_spectrum = ds_group['standard_spectrum']
+        ds_standard_attrs = dict(ds_standard_spectrum.attrs)
         if 'image' in ds_group:
-            ds_img = ds_group['image'][...]
+            ds_image = ds_group['image']
+            ds_image_attrs = dict(ds_image.attrs)
+            ds_img = _read_dataset(ds_image)
             
-            self.ds_calibration_filename = ds_group['image'].attrs['filename']
+            self.ds_calibration_filename = ds_image_attrs['filename']
             if len(ds_img.shape) == 2:
                 img_dimension = (ds_img.shape[1],
                                 ds_img.shape[0])
@@ -491,11 +590,11 @@ class TemperatureModelConfiguration(QtCore.QObject):
             ds_group_roi_bg = ds_group['roi_bg'][...]
             self.roi_data_manager.set_roi(0, img_dimension, ds_group_roi)
             self.roi_data_manager.set_roi(2, img_dimension, ds_group_roi_bg)
-            x_calibration = ds_group['image'].attrs['x_calibration'][...] # this is a hack to be able to 
+            x_calibration = ds_image_attrs['x_calibration'][...] # this is a hack to be able to 
                                                                           # load h5 files later that don't 
                                                                           # have x_calibration
-            if 'subtract_bg'in ds_group['image'].attrs:
-                use_data_bg = bool(ds_group['image'].attrs['subtract_bg'])
+            if 'subtract_bg'in ds_image_attrs:
+                use_data_bg = bool(ds_image_attrs['subtract_bg'])
                 self.use_insitu_data_background = use_data_bg
                 self.ds_temperature_model.subtract_inistu_data_background = use_data_bg
                 self.us_temperature_model.subtract_inistu_data_background = use_data_bg
@@ -508,9 +607,8 @@ class TemperatureModelConfiguration(QtCore.QObject):
             self.ds_calibration_img_file.filename = self.ds_calibration_filename
 
 
-            self.ds_temperature_model.set_calibration_data(ds_img, x_calibration)
-            
-            self.ds_temperature_model._update_all_spectra()
+            # spectra and fits are updated once all calibration parameters are read
+            self.ds_temperature_model.set_calibration_data(ds_img, x_calibration, update=False)
 
 
         else:
@@ -518,11 +616,11 @@ class TemperatureModelConfiguration(QtCore.QObject):
             self.ds_calibration_filename = None
             self.ds_roi = [0, 0, 0, 0]
 
-        standard_data = ds_group['standard_spectrum'][...]
+        standard_data = _read_dataset(ds_standard_spectrum)
         self.ds_temperature_model.calibration_parameter.set_standard_spectrum(Spectrum(standard_data[0, :],
                                                                                      standard_data[1, :]))
-        if 'subtract_bg'in ds_group['standard_spectrum'].attrs:
-            use_calibration_bg = bool(ds_group['standard_spectrum'].attrs['subtract_bg'])
+        if 'subtract_bg'in ds_standard_attrs:
+            use_calibration_bg = bool(ds_standard_attrs['subtract_bg'])
             self.use_insitu_calibration_background = use_calibration_bg
 
             
@@ -531,10 +629,10 @@ class TemperatureModelConfiguration(QtCore.QObject):
 
         try:
             self.ds_temperature_model.calibration_parameter.standard_file_name = \
-                ds_group['standard_spectrum'].attrs['filename']
+                ds_standard_attrs['filename']
         except AttributeError:
             self.ds_temperature_model.calibration_parameter.standard_file_name = \
-                ds_group['standard_spectrum'].attrs['filename']
+                ds_standard_attrs['filename']
 
         modus = int(ds_group['modus'][...])
         self.ds_temperature_model.calibration_parameter.set_modus(modus)
@@ -542,10 +640,15 @@ class TemperatureModelConfiguration(QtCore.QObject):
         self.ds_temperature_model.calibration_parameter.set_temperature(temperature)
 
         us_group = f['upstream_calibration']
+        us_standard_spectrum = us_group['standard_spectrum']
+        us_standard_attrs = dict(us_standard_spectrum.attrs)
+        us_image_attrs = {}
         if 'image' in us_group:
-            us_img = us_group['image'][...]
+            us_image = us_group['image']
+            us_image_attrs = dict(us_image.attrs)
+            us_img = _read_dataset(us_image)
             
-            self.us_calibration_filename = us_group['image'].attrs['filename']
+            self.us_calibration_filename = us_image_attrs['filename']
             if len(us_img.shape) == 2:
                 img_dimension = (us_img.shape[1],
                                 us_img.shape[0])
@@ -558,27 +661,26 @@ class TemperatureModelConfiguration(QtCore.QObject):
             self.roi_data_manager.set_roi(1, img_dimension, us_group_roi)
             self.roi_data_manager.set_roi(3, img_dimension, us_group_roi_bg)
             self.us_temperature_model.set_calibration_data(us_img,
-                                                           us_group['image'].attrs['x_calibration'][...])
-            self.us_temperature_model._update_all_spectra()
+                                                           us_image_attrs['x_calibration'][...], update=False)
         else:
             self.us_temperature_model.reset_calibration_data()
             self.us_calibration_filename = None
             self.us_roi = [0, 0, 0, 0]
 
-        standard_data = us_group['standard_spectrum'][...]
+        standard_data = _read_dataset(us_standard_spectrum)
         self.us_temperature_model.calibration_parameter.set_standard_spectrum(Spectrum(standard_data[0, :],
                                                                                      standard_data[1, :]))
         
-        if 'subtract_bg'in us_group['image'].attrs:
-                use_data_bg = bool(us_group['image'].attrs['subtract_bg'])
+        if 'subtract_bg'in us_image_attrs:
+                use_data_bg = bool(us_image_attrs['subtract_bg'])
                 self.use_insitu_data_background = use_data_bg
 
         try:
             self.us_temperature_model.calibration_parameter.standard_file_name = \
-                us_group['standard_spectrum'].attrs['filename']
+                us_standard_attrs['filename']
         except AttributeError:
             self.us_temperature_model.calibration_parameter.standard_file_name = \
-                us_group['standard_spectrum'].attrs['filename']
+                us_standard_attrs['filename']
             
         self.us_calibration_img_file = DataModel()
         self.us_calibration_img_file.img = us_img
@@ -589,6 +691,7 @@ class TemperatureModelConfiguration(QtCore.QObject):
         self.us_temperature_model.calibration_parameter.set_modus(modus)
         temperature = float(us_group['temperature'][...])
         self.us_temperature_model.calibration_parameter.set_temperature(temperature)
+        f.close()
 
         self.ds_temperature_model._update_all_spectra()
         self.us_temperature_model._update_all_spectra()
@@ -597,14 +700,9 @@ class TemperatureModelConfiguration(QtCore.QObject):
         self.us_temperature_model.fit_data()
 
 
-        self.data_changed_emit(self.current_frame)
-
-        self.setting_filename = filename
-
-
     
 
-    def save_txt(self, filename):
+    def save_txt(self, filename, binary=False):
         """
         Saves the fitted temperatures, original spectra and fitted spectra into a txt file
         Format:
@@ -617,8 +715,12 @@ class TemperatureModelConfiguration(QtCore.QObject):
         if the original spe file contains several frames, all frames will be saved in order with always data and then
         fit.
         :param filename: path to save the file to
+        :param binary: if True, both sides are saved into a single hdf5 file (see save_h5) instead of two txt files
         :return:
         """
+        if binary:
+            self.save_h5(filename.rsplit('.', 1)[0] + '.h5')
+            return
 
         # creating the header:
         header = "Fitted Temperatures:\n"
@@ -632,16 +734,39 @@ class TemperatureModelConfiguration(QtCore.QObject):
         us_filename = filename.rsplit('.', 1)[0] + '_us.txt'
 
         if self.ds_fit_spectrum.y.size == self.ds_corrected_spectrum.y.size:
-            output_matrix_ds = np.vstack((self.ds_data_spectrum.x,
-                                        self.ds_corrected_spectrum.y, self.ds_fit_spectrum.y))
+            # built directly as rows of (wavelength, data, fit), no transposed copy is needed for savetxt
+            output_matrix_ds = np.column_stack((self.ds_data_spectrum.x,
+                                                self.ds_corrected_spectrum.y, self.ds_fit_spectrum.y))
             
-            np.savetxt(ds_filename, output_matrix_ds.T, header=header_ds)
+            np.savetxt(ds_filename, output_matrix_ds, header=header_ds)
 
         if self.us_corrected_spectrum.y.size ==  self.us_fit_spectrum.y.size:
-            output_matrix_us = np.vstack((self.us_data_spectrum.x,
-                                        self.us_corrected_spectrum.y, self.us_fit_spectrum.y))
+            output_matrix_us = np.column_stack((self.us_data_spectrum.x,
+                                                self.us_corrected_spectrum.y, self.us_fit_spectrum.y))
+
+            np.savetxt(us_filename, output_matrix_us, header=header_us)
 
-            np.savetxt(us_filename, output_matrix_us.T, header=header_us)
+    def save_h5(self, filename):
+        """
+        Saves the same data as save_txt into a binary hdf5 file, which is much faster to write than formatted text.
+        Each side is stored in a group ('downstream_spectra', 'upstream_spectra') holding a 'spectra' dataset with the
+        columns wavelength(nm), data and fit, the fitted temperature and its error are stored as attributes.
+        :param filename: path to save the file to
+        """
+        with h5py.File(filename, 'w') as f:
+            for group_name, data_spectrum, corrected_spectrum, fit_spectrum, temperature, temperature_error in (
+                    ('downstream_spectra', self.ds_data_spectrum, self.ds_corrected_spectrum, self.ds_fit_spectrum,
+                     self.ds_temperature, self.ds_temperature_error),
+                    ('upstream_spectra', self.us_data_spectrum, self.us_corrected_spectrum, self.us_fit_spectrum,
+                     self.us_temperature, self.us_temperature_error)):
+                if fit_spectrum.y.size != corrected_spectrum.y.size:
+                    continue
+                output_matrix = np.column_stack((data_spectrum.x, corrected_spectrum.y, fit_spectrum.y))
+                group = f.create_group(group_name)
+                spectra = group.create_dataset('spectra', data=output_matrix)
+                spectra.attrs['columns'] = ["wavelength(nm)", "data", "fit"]
+                spectra.attrs['temperature'] = temperature
+                spectra.attrs['temperature_error'] = temperature_error
 
 
     # updating wavelength range values
@@ -666,22 +791,28 @@ class TemperatureModelConfiguration(QtCore.QObject):
     def wl_range(self, wl_range):
         
         wl = self.x_calibration
-        wl_max = max(wl)
-        wl_min = min(wl)
-        if wl_range[0] >= wl_min:
-            if wl_range[0] <= wl_max:
-                x_1 = int(round(get_partial_index(wl,wl_range[0])))
-            else:
-                x_1 = len(wl)-1
+        if wl[0] <= wl[-1]:
+            # ascending calibration, both limits are found with a single binary search. Wavelengths outside of the
+            # calibration are clipped to the first/last pixel
+            wl_limits = np.clip(wl_range[:2], wl[0], wl[-1])
+            x_1, x_2 = (int(round(ind)) for ind in get_partial_index_sorted(wl, wl_limits))
         else:
-            x_1 = 0
-        if wl_range[1] >= wl_min:
-            if wl_range[1] <= wl_max:
-                x_2 = int(round(get_partial_index(wl,wl_range[1])))
+            wl_max = np.amax(wl)
+            wl_min = np.amin(wl)
+            if wl_range[0] >= wl_min:
+                if wl_range[0] <= wl_max:
+                    x_1 = int(round(get_partial_index(wl,wl_range[0])))
+                else:
+                    x_1 = len(wl)-1
             else:
-                x_2 = len(wl)-1
-        else:
-            x_2 = 0
+                x_1 = 0
+            if wl_range[1] >= wl_min:
+                if wl_range[1] <= wl_max:
+                    x_2 = int(round(get_partial_index(wl,wl_range[1])))
+                else:
+                    x_2 = len(wl)-1
+            else:
+                x_2 = 0
         x_start = min(x_1,x_2)
         x_end = max(x_1,x_2)
 
@@ -699,10 +830,11 @@ class TemperatureModelConfiguration(QtCore.QObject):
         us_bg_limits[0] = x_start
         us_bg_limits[1] = x_end
 
-        ds_roi = self.roi_data_manager.get_roi(0, self.data_img_file.get_dimension())
-        us_roi = self.roi_data_manager.get_roi(1, self.data_img_file.get_dimension())
-        ds_bg_roi = self.roi_data_manager.get_roi(2, self.data_img_file.get_dimension())
-        us_bg_roi = self.roi_data_manager.get_roi(3, self.data_img_file.get_dimension())
+        dim = self.data_img_file.get_dimension()
+        ds_roi = self.roi_data_manager.get_roi(0, dim)
+        us_roi = self.roi_data_manager.get_roi(1, dim)
+        ds_bg_roi = self.roi_data_manager.get_roi(2, dim)
+        us_bg_roi = self.roi_data_manager.get_roi(3, dim)
 
         ds_limits[2] = ds_roi.y_min
         ds_limits[3] = ds_roi.y_max
@@ -713,10 +845,10 @@ class TemperatureModelConfiguration(QtCore.QObject):
         us_bg_limits[2] = us_bg_roi.y_min
         us_bg_limits[3] = us_bg_roi.y_max
 
-        self.roi_data_manager.set_roi(0, self.data_img_file.get_dimension(), ds_limits)
-        self.roi_data_manager.set_roi(1, self.data_img_file.get_dimension(), us_limits)
-        self.roi_data_manager.set_roi(2, self.data_img_file.get_dimension(), ds_bg_limits)
-        self.roi_data_manager.set_roi(3, self.data_img_file.get_dimension(), us_bg_limits)
+        self.roi_data_manager.set_roi(0, dim, ds_limits)
+        self.roi_data_manager.set_roi(1, dim, us_limits)
+        self.roi_data_manager.set_roi(2, dim, ds_bg_limits)
+        self.roi_data_manager.set_roi(3, dim, us_bg_limits)
 
         '''self.ds_temperature_model._update_all_spectra()
         self.ds_temperature_model.fit_data()
@@ -786,10 +918,19 @@ class TemperatureModelConfiguration(QtCore.QObject):
         self.us_calculations_changed_emit()
 
     def set_rois(self, limits):
-        self.us_roi = limits[1]
-        self.ds_roi = limits[0]
-        self.us_roi_bg = limits[3]
-        self.ds_roi_bg = limits[2]
+        # all four rois are set first, then each side is recalculated and fitted only once
+        dim = self.data_img_file.get_dimension()
+        self.roi_data_manager.set_roi(0, dim, limits[0])
+        self.roi_data_manager.set_roi(1, dim, limits[1])
+        self.roi_data_manager.set_roi(2, dim, limits[2])
+        self.roi_data_manager.set_roi(3, dim, limits[3])
+
+        self.us_temperature_model._update_all_spectra()
+        self.us_temperature_model.fit_data()
+        self.ds_temperature_model._update_all_spectra()
+        self.ds_temperature_model.fit_data()
+        self.us_calculations_changed_emit()
+        self.ds_calculations_changed_emit()
 
 
     def get_roi_data_list(self):
@@ -902,7 +1043,9 @@ class TemperatureModelConfiguration(QtCore.QObject):
 
         cur_frame = self.current_frame
         self.blockSignals(True)
-        
+        # the frames are still written to the log, but the views are only updated once at the end and not for
+        # every fitted frame (blockSignals only affects Qt signals, not the model Signals)
+        self.data_changed_signal.blocked = True
 
         us_temperature = []
         ds_temperature = []
@@ -910,29 +1053,32 @@ class TemperatureModelConfiguration(QtCore.QObject):
         us_temperature_error = []
         ds_temperature_error = []
 
-        for frame_ind in range(self.data_img_file.num_frames):
-            self.set_img_frame_number_to(frame_ind)
+        try:
+            for frame_ind in range(self.data_img_file.num_frames):
+                self.set_img_frame_number_to(frame_ind)
            
-            us_counts = int(self.us_temperature_model.total_counts)
-            ds_counts = int(self.ds_temperature_model.total_counts)
-            max_counts = int(np.amax(np.asarray([us_counts,ds_counts])))
-            us_sufficient_counts = us_counts > (0.075*max_counts)
-            ds_sufficient_counts = ds_counts > (0.075*max_counts)
-
-            if us_sufficient_counts and self.us_temperature_model.temperature_error<=self.error_limit:
-                us_temperature.append(self.us_temperature_model.temperature)
-                us_temperature_error.append(self.us_temperature_model.temperature_error)
-            else:
-                us_temperature.append(0)
-                us_temperature_error.append(0)
-            if ds_sufficient_counts and self.ds_temperature_model.temperature_error<=self.error_limit:
-                ds_temperature.append(self.ds_temperature_model.temperature)
-                ds_temperature_error.append(self.ds_temperature_model.temperature_error)
-            else:
-                ds_temperature.append(0)
-                ds_temperature_error.append(0)
-
-        self.set_img_frame_number_to(cur_frame)
+                us_counts = int(self.us_temperature_model.total_counts)
+                ds_counts = int(self.ds_temperature_model.total_counts)
+                max_counts = int(np.amax(np.asarray([us_counts,ds_counts])))
+                us_sufficient_counts = us_counts > (0.075*max_counts)
+                ds_sufficient_counts = ds_counts > (0.075*max_counts)
+
+                if us_sufficient_counts and self.us_temperature_model.temperature_error<=self.error_limit:
+                    us_temperature.append(self.us_temperature_model.temperature)
+                    us_temperature_error.append(self.us_temperature_model.temperature_error)
+                else:
+                    us_temperature.append(0)
+                    us_temperature_error.append(0)
+                if ds_sufficient_counts and self.ds_temperature_model.temperature_error<=self.error_limit:
+                    ds_temperature.append(self.ds_temperature_model.temperature)
+                    ds_temperature_error.append(self.ds_temperature_model.temperature_error)
+                else:
+                    ds_temperature.append(0)
+                    ds_temperature_error.append(0)
+        finally:
+            self.data_changed_signal.blocked = False
+        if not self.set_img_frame_number_to(cur_frame):
+            self.data_changed_signal.emit()
         self.blockSignals(False)
         self.us_temperatures = us_temperature
         self.us_temperatures_errors = us_temperature_error
@@ -961,6 +1107,11 @@ class SingleTemperatureModel(QtCore.QObject):
         self._data_img = None
         self._data_img_x_calibration = None
         self._data_img_dimension = None
+        self._data_x_slice = slice(0, 0)
+
+        # wien_wavelength_terms of _data_img_x_calibration, recomputed only when the calibration changes
+        self._wien_terms = None
+        self._wien_terms_x_calibration = None
 
         self.data_roi_max = 0
 
@@ -984,7 +1135,8 @@ class SingleTemperatureModel(QtCore.QObject):
         return self._data_img
 
     def set_data(self, img_data, x_calibration):
-        self._data_img = img_data
+        # converted once here (without copying or changing the dtype), the spectrum updates then only take views
+        self._data_img = np.asarray(img_data)
         self._data_img_x_calibration = x_calibration
         self._data_img_dimension = (img_data.shape[1], img_data.shape[0])
 
@@ -1000,7 +1152,7 @@ class SingleTemperatureModel(QtCore.QObject):
     
 
 
-    def set_calibration_data(self, img_data_file, x_calibration):
+    def set_calibration_data(self, img_data_file, x_calibration, update=True):
         calibration_frames=self.calibration_frames
 
         if hasattr(img_data_file,'img'):
@@ -1016,8 +1168,9 @@ class SingleTemperatureModel(QtCore.QObject):
                 img_data_selected = img_data[calibration_frames[0]:calibration_frames[1]+1]
             else:
                 img_data_selected = img_data[:]
-            # Stack and average along the first dimension of the list
-            average_array = np.mean(img_data_selected, axis=0)
+            # Stack and average along the first dimension of the list, float32 holds averaged camera counts
+            # without loss and halves the size of the image summed for every calibration spectrum
+            average_array = np.mean(img_data_selected, axis=0, dtype=np.float32)
             self._calibration_img = average_array
         else:
             if len(img_data.shape) == 3:
@@ -1026,7 +1179,7 @@ class SingleTemperatureModel(QtCore.QObject):
                 else:
                     img_data_selected = img_data[:]
                 # Stack and average along the first dimension of the list
-                average_array = np.mean(img_data_selected, axis=0)
+                average_array = np.mean(img_data_selected, axis=0, dtype=np.float32)
                 self._calibration_img = average_array
 
             else:
@@ -1034,10 +1187,10 @@ class SingleTemperatureModel(QtCore.QObject):
 
         self._calibration_img_dimension = (self._calibration_img.shape[1], self._calibration_img.shape[0])
        
-
-        self._update_calibration_spectrum()
-        self._update_corrected_spectrum()
-        self.fit_data()
+        if update:
+            self._update_calibration_spectrum()
+            self._update_corrected_spectrum()
+            self.fit_data()
         #self.data_changed_stm.emit()
 
     def set_temperature_fit_function(self, function_type_str:str):
@@ -1062,7 +1215,7 @@ class SingleTemperatureModel(QtCore.QObject):
     #########################################################################
     def load_standard_spectrum(self, filename):
         self.calibration_parameter.load_standard_spectrum(filename)
-        self._update_all_spectra()
+        self._update_lamp_dependent_spectra()
         self.fit_data()
 
     
@@ -1074,59 +1227,51 @@ class SingleTemperatureModel(QtCore.QObject):
 
     def set_calibration_modus(self, modus):
         self.calibration_parameter.set_modus(modus)
-        self._update_all_spectra()
+        self._update_lamp_dependent_spectra()
         self.fit_data()
 
     def set_calibration_temperature(self, temperature):
         self.calibration_parameter.set_temperature(temperature)
-        self._update_all_spectra()
+        self._update_lamp_dependent_spectra()
         self.fit_data()
 
     # Spectrum calculations
     #########################################################################
 
+    def scan_column_limit(self, array, limit=65534):
+        """
+        Checks all columns of array against limit in a single pass.
+        :return: mask of the columns with all values below or equal to limit, number of columns above limit and
+                 number of columns within limit
+        """
+        within_limit = array.max(axis=0) <= limit
+        below_limit_count = int(np.count_nonzero(within_limit))
+        return within_limit, within_limit.size - below_limit_count, below_limit_count
+
     def columns_within_limit(self, array, limit=65534):
-        # Check if any element in each column is above the limit
-        above_limit = np.any(array > limit, axis=0)
-        return ~above_limit
+        return self.scan_column_limit(array, limit)[0]
 
     def count_columns_above_limit(self, array, limit=65534):
-        # Check if any element in each column is above the limit
-        above_limit = np.any(array > limit, axis=0)
-        # Check if all elements in each column are below or equal to the limit
-        below_limit = ~np.any(array > limit, axis=0)
-        # Count the number of True values (columns with values above limit)
-        above_limit_count = np.sum(above_limit)
-        # Count the number of True values (columns with all values below or equal to limit)
-        below_limit_count = np.sum(below_limit)
-        return above_limit_count, below_limit_count
+        return self.scan_column_limit(array, limit)[1:]
 
  
 
     def _update_data_spectrum(self):
         if self._data_img is not None:
-            _data_img_as_array = np.asarray(self._data_img)
             roi = self.roi_data_manager.get_roi(self.ind, self._data_img_dimension)
             if self.subtract_inistu_data_background:
                 roi_bg = self.roi_data_manager.get_roi(self.ind+2, self._data_img_dimension)
                 roi_bg.x_max = roi.x_max
                 roi_bg.x_min = roi.x_min
+            else:
+                roi_bg = None
 
-            roi_img = get_roi_img(_data_img_as_array, roi)
-            within_limit = self.columns_within_limit(roi_img)
-            if np.any(roi_img > 65534):
-                above_limit_count, below_limit_count = self.count_columns_above_limit(roi_img)
-                #print("saturated columns = " + str(above_limit_count))
+            # column sums, saturated columns, maximum and background subtraction are all done in one pass
+            data_y, within_limit, self.data_roi_max = get_roi_stats(self._data_img, roi, roi_bg=roi_bg)
+
+            self._data_x_slice = slice(int(roi.x_min), int(roi.x_max) + 1)
+            data_x = self._data_img_x_calibration[self._data_x_slice]
 
-            data_x = self._data_img_x_calibration[int(roi.x_min):int(roi.x_max) + 1]
-            data_y = get_roi_sum(_data_img_as_array, roi)
-            
-            
-            self.data_roi_max = get_roi_max(_data_img_as_array, roi)
-            if self.subtract_inistu_data_background:
-                data_y_bg = get_roi_sum(_data_img_as_array, roi_bg)
-                data_y = data_y - data_y_bg
-            
             self.total_counts = np.sum(data_y)
             self.data_spectrum.data = data_x, data_y
             self.data_spectrum.mask = within_limit
@@ -1163,11 +1308,27 @@ class SingleTemperatureModel(QtCore.QObject):
         else:
             self.corrected_spectrum = Spectrum([], [])
 
+    def _update_lamp_dependent_spectra(self):
+        # the data and calibration spectra do not depend on the calibration parameter, only the corrected one does
+        self._update_corrected_spectrum()
+
     def _update_all_spectra(self):
         self._update_data_spectrum()
         self._update_calibration_spectrum()
         self._update_corrected_spectrum()
 
+    def _get_wien_terms(self):
+        """
+        Returns the wien_wavelength_terms of the current data spectrum, they are computed once per wavelength
+        calibration and then only sliced to the roi.
+        """
+        x_calibration = self._data_img_x_calibration
+        if self._wien_terms is None or self._wien_terms_x_calibration is not x_calibration:
+            self._wien_terms = wien_wavelength_terms(np.asarray(x_calibration) * 1e-9)
+            self._wien_terms_x_calibration = x_calibration
+        x, y_offset = self._wien_terms
+        return x[self._data_x_slice], y_offset[self._data_x_slice]
+
     # finally the fitting function
     ##################################################################
     def fit_data(self):
@@ -1178,14 +1339,19 @@ class SingleTemperatureModel(QtCore.QObject):
                 #print('count_true '+ str(count_true))
                 if count_true > 20:
                     counts = self.data_spectrum.data[1]
-                    average_counts = sum(counts)/len(counts)
+                    average_counts = float(np.mean(counts))
                     #print(average_counts)
                     if len(self.corrected_spectrum):
                         
                         if average_counts >3 :
                             #now = time.time()
+                            if self.temperature_fit_function is fit_black_body_function_wien:
+                                fit_result = fit_black_body_function_wien(self.corrected_spectrum,
+                                                                          self._get_wien_terms())
+                            else:
+                                fit_result = self.temperature_fit_function(self.corrected_spectrum)
                             self.temperature, self.temperature_error, self.fit_spectrum, self.scaling = \
-                                self.temperature_fit_function(self.corrected_spectrum)
+                                fit_result
                             okay = True
                             #later = time.time()
                             #elapsed = later - now
@@ -1215,11 +1381,12 @@ class SingleTemperatureModel(QtCore.QObject):
 
 def calculate_real_spectrum(data_spectrum, calibration_spectrum, standard_spectrum):
     response_y = calibration_spectrum._y / standard_spectrum._y
-    response_y[np.where(response_y == 0)] = np.nan
+    response_y[response_y == 0] = np.nan
     response = Spectrum(data_spectrum._x, response_y)
     
     corrected_y = data_spectrum._y / response_y
-    corrected_y = corrected_y / np.max(corrected_y) * np.max(data_spectrum._y)
+    # rescaled in place with a single scalar factor
+    corrected_y *= np.max(data_spectrum._y) / np.max(corrected_y)
     return Spectrum(data_spectrum._x, corrected_y), response
 
 
@@ -1228,7 +1395,8 @@ def fit_black_body_function(spectrum):
     _x = data[0]
     _y = data[1]
     try:
-        param, cov = curve_fit(black_body_function, _x, _y, p0=[2500, 1e-11])
+        param, cov = curve_fit(black_body_function, _x, _y, p0=[2500, 1e-11], jac=black_body_function_jac,
+                               xtol=BLACK_BODY_FIT_TOL, ftol=BLACK_BODY_FIT_TOL, maxfev=BLACK_BODY_FIT_MAXFEV)
         T = param[0]
         scaling = param[1]
         T_err = np.sqrt(cov[0, 0])
@@ -1238,30 +1406,88 @@ def fit_black_body_function(spectrum):
         #print(f"Fit failed with error: {e}")
         return np.nan, np.nan, Spectrum([], []), np.nan
     
-def fit_black_body_function_wien(spectrum):
+def fit_black_body_function_wien(spectrum, wavelength_terms=None):
     data = spectrum.data_masked
     _x = data[0]
     _y = data[1]
     _y [_y <0] = 0.1
-    x, y = wien_pre_transform(_x * 1e-9, _y)
+    if wavelength_terms is not None:
+        # the precomputed terms cover the unmasked spectrum
+        if spectrum.mask is not None and spectrum.mask.shape[0] == wavelength_terms[0].shape[0]:
+            wavelength_terms = (wavelength_terms[0][spectrum.mask], wavelength_terms[1][spectrum.mask])
+        if wavelength_terms[0].shape != _x.shape:
+            wavelength_terms = None
+    _x_m = _x * 1e-9
+    x, y = wien_pre_transform(_x_m, _y, wavelength_terms)
     
     #av = np.average(y)
     m, b, m_std_dev_res = fit_linear(x,y, True)
     T, T_std_dev = m_to_T(m, m_std_dev_res)
     
     
-    wavelength, best_fit = m_b_wien(_x * 1e-9, m, b)
+    wavelength, best_fit = m_b_wien(_x_m, m, b)
     sp = Spectrum(wavelength *1e9, best_fit)
     sp.mask = spectrum.mask
     
     return T, T_std_dev, sp, np.nan
-    
+
+
+BLACK_BODY_C1 = 3.7418e-16
+BLACK_BODY_C2 = 0.014388
+
+# relative tolerances and evaluation limit of the Planck least squares fit, the temperature is converged far below
+# its fit error at these tolerances; lower them for a final analysis if needed
+BLACK_BODY_FIT_TOL = 1e-5
+BLACK_BODY_FIT_MAXFEV = 200
+
+if NUMBA_INSTALLED:
+
+    @numba.njit(cache=True, error_model='numpy')
+    def _black_body_function(wavelength_nm, temp, scaling):
+        # single pass without temporaries, curve_fit evaluates this many times per fit
+        result = np.empty(wavelength_nm.shape[0])
+        for i in range(wavelength_nm.shape[0]):
+            wavelength = wavelength_nm[i] * 1e-9
+            result[i] = scaling * BLACK_BODY_C1 * wavelength ** -5 / \
+                        (np.exp(BLACK_BODY_C2 / (wavelength * temp)) - 1)
+        return result
+
 
 def black_body_function(wavelength, temp, scaling):
-    wavelength = np.array(wavelength) * 1e-9
-    c1 = 3.7418e-16
-    c2 = 0.014388
-    return scaling * c1 * wavelength ** -5 / (np.exp(c2 / (wavelength * temp)) - 1)
+    wavelength = np.asarray(wavelength, dtype=np.float64)
+    if NUMBA_INSTALLED and wavelength.ndim == 1:
+        return _black_body_function(wavelength, float(temp), float(scaling))
+    wavelength = wavelength * 1e-9
+    return scaling * BLACK_BODY_C1 * wavelength ** -5 / (np.exp(BLACK_BODY_C2 / (wavelength * temp)) - 1)
+
+
+if NUMBA_INSTALLED:
+
+    @numba.njit(cache=True, error_model='numpy')
+    def _black_body_function_jac(wavelength_nm, temp, scaling):
+        # the exponential is evaluated once per point and shared by both derivatives
+        result = np.empty((wavelength_nm.shape[0], 2))
+        for i in range(wavelength_nm.shape[0]):
+            wavelength = wavelength_nm[i] * 1e-9
+            exponent = BLACK_BODY_C2 / (wavelength * temp)
+            exp_term = np.exp(exponent)
+            d_scaling = BLACK_BODY_C1 * wavelength ** -5 / (exp_term - 1)
+            result[i, 0] = scaling * d_scaling * exp_term / (exp_term - 1) * exponent / temp
+            result[i, 1] = d_scaling
+        return result
+
+
+def black_body_function_jac(wavelength, temp, scaling):
+    # analytic partial derivatives of black_body_function with respect to temp and scaling
+    wavelength = np.asarray(wavelength, dtype=np.float64)
+    if NUMBA_INSTALLED and wavelength.ndim == 1:
+        return _black_body_function_jac(wavelength, float(temp), float(scaling))
+    wavelength = wavelength * 1e-9
+    exponent = BLACK_BODY_C2 / (wavelength * temp)
+    exp_term = np.exp(exponent)
+    d_scaling = BLACK_BODY_C1 * wavelength ** -5 / (exp_term - 1)
+    d_temp = scaling * d_scaling * exp_term / (exp_term - 1) * exponent / temp
+    return np.column_stack((d_temp, d_scaling))
 
 
 class CalibrationParameter(object):
@@ -1276,12 +1502,17 @@ class CalibrationParameter(object):
         self._standard_y = np.array([])
         self.standard_file_name = 'Select File...'
 
+        # (key, wavelength, lamp_y) of the last get_lamp_y call, the lamp spectrum is the same for every frame
+        self._lamp_cache = None
+
     def set_modus(self, modus):
         modus = int(modus)
         self.modus = modus
+        self._lamp_cache = None
 
     def set_temperature(self, temperature):
         self.temperature = temperature
+        self._lamp_cache = None
 
     
 
@@ -1298,6 +1529,7 @@ class CalibrationParameter(object):
                     data = np.loadtxt(filename, delimiter='\t')
         self._standard_x = data.T[0]
         self._standard_y = data.T[1]
+        self._lamp_cache = None
 
         self.standard_file_name = filename
 
@@ -1307,6 +1539,18 @@ class CalibrationParameter(object):
         np.savetxt(filename,data)
 
     def get_lamp_y(self, wavelength):
+        # the setters reset the cache, modus and temperature are still compared in case they are assigned directly
+        key = (self.modus, self.temperature)
+        if self._lamp_cache is not None:
+            cached_key, cached_wavelength, cached_y = self._lamp_cache
+            # the cache holds a copy of the wavelength, callers may modify their array in place
+            if cached_key == key and np.array_equal(cached_wavelength, wavelength):
+                return cached_y
+        lamp_y = self._calculate_lamp_y(wavelength)
+        self._lamp_cache = (key, np.array(wavelength), lamp_y)
+        return lamp_y
+
+    def _calculate_lamp_y(self, wavelength):
         if self.modus == 0:
             y = black_body_function(wavelength, self.temperature, 1)
             return y / max(y)
@@ -1336,3 +1580,4 @@ class CalibrationParameter(object):
             self._standard_y = spectrum.y
         except AttributeError:
             pass
+        self._lamp_cache = None
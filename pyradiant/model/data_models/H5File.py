@@ -42,6 +42,7 @@ RH: Updated March 25, 2024
 """
 
 import h5py
+import numpy as np
 from .DataModel import DataModel
 
 class H5File(DataModel):
@@ -62,11 +63,11 @@ class H5File(DataModel):
         self._xdim = 0
         self._ydim = 0
         self.debug = debug
-        self._fid = h5py.File(filename, 'r')
         self.gain = 1
 
-        self._load_h5()
-        self.num_frames = 1
+        # everything is read in _load_h5, the file handle is not kept open afterwards
+        with h5py.File(filename, 'r') as self._fid:
+            self._load_h5()
 
         self.x_calibration = x_calibration
         
@@ -75,9 +76,16 @@ class H5File(DataModel):
         f =  self._fid
         detector_group = f['detector']
         if 'data1' in detector_group:
-            data_img = detector_group['data1'][...]
-            self.img = data_img
-            [self._ydim, self._xdim] = data_img.shape
+            dset = detector_group['data1']
+            if dset.ndim == 3:
+                # image stack, the first axis are the frames, img[frame] then returns a single frame like for
+                # multi frame SPE files
+                [self.num_frames, self._ydim, self._xdim] = dset.shape
+            else:
+                [self._ydim, self._xdim] = dset.shape
+            self.img = np.empty(dset.shape, dtype=dset.dtype)
+            if self.img.size:
+                dset.read_direct(self.img)
             
         if 'CameraModel' in f:
             self.detector = f['CameraModel'][0].decode('utf-8')
@@ -450,6 +450,14 @@ class SpeFile(DataModel):
         return np.fromfile(self._fid, ntype, size)
 
     def _read_img(self):
+        if self.num_frames > 1 and not self._has_roi_layout():
+            stack = self._read_frames(4100)
+            if stack is not None:
+                # the frames and raw_ccd are views of the single stack that was read, nothing is copied
+                self.img = list(stack)
+                self.raw_ccd = stack.reshape((-1, self._xdim))
+                return
+
         self.img = self._read_frame(4100)
         
         if self.num_frames > 1:
@@ -481,6 +489,31 @@ class SpeFile(DataModel):
             return obj
     
 
+    def _has_roi_layout(self):
+        """Frames with ROI information have to be placed onto the full sensor and can not be read as one stack"""
+        return hasattr(self, 'num_rois') and self.num_rois >= 1 and hasattr(self, 'sensor_width')
+
+    def _get_dtype(self):
+        if self._data_type == 0:
+            return np.float32
+        elif self._data_type == 1:
+            return np.int32
+        elif self._data_type == 2:
+            return np.int16
+        elif self._data_type == 3:
+            return np.uint16
+        elif self._data_type == 8:
+            return np.uint32
+
+    def _read_frames(self, pos):
+        """Reads all frames starting at binary position pos into one (num_frames, ydim, xdim) array, returns None if
+        the file is too short"""
+        num_frames = int(self.num_frames)
+        stack = self._read_at(pos, num_frames * self._ydim * self._xdim, self._get_dtype())
+        if stack.size < num_frames * self._ydim * self._xdim:
+            return None
+        return stack.reshape((num_frames, self._ydim, self._xdim))
+
     def _read_frame(self, pos=None):
         """Reads in a frame at a specific binary position. The following parameters have to
         be predefined before calling this function:
@@ -490,16 +523,7 @@ class SpeFile(DataModel):
         """
         if pos == None:
             pos = self._fid.tell()
-        if self._data_type == 0:
-            dtype = np.float32
-        elif self._data_type == 1:
-            dtype = np.int32
-        elif self._data_type == 2:
-            dtype = np.int16
-        elif self._data_type == 3:
-            dtype = np.uint16
-        elif self._data_type == 8:
-            dtype = np.uint32
+        dtype = self._get_dtype()
 
         img = self._read_at(pos, self._xdim * self._ydim, dtype)
 
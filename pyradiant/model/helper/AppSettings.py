@@ -6,29 +6,63 @@ class AppSettings:
         self._settings = QSettings(org, app)
         self._group = group
 
-    def set(self, key, value):
+        # all values of the group are read once, get() is then served from memory
+        self._cache = {}
+        # values changed by set() which have not been written to QSettings yet, see sync()
+        self._pending = {}
         self._settings.beginGroup(self._group)
-        self._settings.setValue(key, value)
+        for key in self._settings.allKeys():
+            self._cache[key] = self._settings.value(key)
         self._settings.endGroup()
 
+    def set(self, key, value):
+        # unchanged values are not written again, this avoids touching the registry/ini file on every save
+        if key in self._cache and self._cache[key] == value:
+            return
+        self._cache[key] = value
+        self._pending[key] = value
+
+    def sync(self):
+        """
+        Writes all values changed since the last sync to QSettings within a single group and flushes them to the
+        registry/ini file.
+        """
+        if self._pending:
+            self._settings.beginGroup(self._group)
+            for key, value in self._pending.items():
+                self._settings.setValue(key, value)
+            self._settings.endGroup()
+            self._pending.clear()
+        self._settings.sync()
+
     def get(self, key, default=None):
-        self._settings.beginGroup(self._group)
-        value = self._settings.value(key, default)
-        self._settings.endGroup()
-        return value
+        return self._cache.get(key, default)
 
     def keys(self):
-        self._settings.beginGroup(self._group)
-        keys = self._settings.allKeys()
-        self._settings.endGroup()
-        return keys
+        return list(self._cache.keys())
 
     def dump(self):
         print(f"Dumping settings under [{self._group}]:")
-        for key in self.keys():
-            print(f"  {key} = {self.get(key)}")
+        for key, value in self._cache.items():
+            print(f"  {key} = {value}")
 
     def clear(self):
+        self._cache.clear()
+        self._pending.clear()
         self._settings.beginGroup(self._group)
         self._settings.remove("")
         self._settings.endGroup()
+
+
+_app_settings = None
+
+
+def get_app_settings():
+    """
+    Returns the application wide AppSettings instance, it is created on first use so that the underlying
+    QSettings (registry/ini file) is only opened once per session.
+    """
+    global _app_settings
+    if _app_settings is None:
+        _app_settings = AppSettings()
+    return _app_settings
@@ -17,11 +17,31 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import bisect
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 from PyQt6 import QtCore
 import re
 
+# folders with more files than this are stat'ed from a thread pool, this hides the latency of network shares
+PARALLEL_STAT_MIN_FILES = 64
+PARALLEL_STAT_WORKERS = 16
+
+
+def get_entry_times(entries, time_attribute='st_mtime'):
+    """
+    Reads a time stamp for a list of os.DirEntry objects.
+    :param entries: list of os.DirEntry, e.g. from os.scandir
+    :param time_attribute: attribute of os.stat_result which is returned, e.g. 'st_mtime' or 'st_ctime'
+    :return: list of time stamps in the order of entries
+    """
+    if len(entries) < PARALLEL_STAT_MIN_FILES:
+        return [getattr(entry.stat(), time_attribute) for entry in entries]
+    with ThreadPoolExecutor(max_workers=PARALLEL_STAT_WORKERS) as executor:
+        return list(executor.map(lambda entry: getattr(entry.stat(), time_attribute), entries))
+
+
 class FileNameIterator(QtCore.QObject):
     # TODO create an File Index and then just get the next files according to this.
     # Otherwise searching a network is always to slow...
@@ -32,6 +52,8 @@ class FileNameIterator(QtCore.QObject):
         self.directory_watcher = QtCore.QFileSystemWatcher()
         self.directory_watcher.directoryChanged.connect(self.add_new_files_to_list)
         self.create_timed_file_list = False
+        # time stamp of every path in ordered_file_list, used to find a path in the list with a binary search
+        self._file_times = {}
 
         if filename is None:
             self.complete_path = None
@@ -47,29 +69,23 @@ class FileNameIterator(QtCore.QObject):
 
     def _get_files_list(self):
         t1 = time.time()
-        filename_list = os.listdir(self.directory)
-        files = []
-        for file in filename_list:
-            if self.is_correct_file_type(file):
-                files.append(file)
-        paths = [os.path.join(self.directory, file) for file in files]
-        file_list = [(os.path.getmtime(path), path) for path in paths]
+        with os.scandir(self.directory) as it:
+            entries = [entry for entry in it if self.is_correct_file_type(entry.name)]
+        paths = [entry.path for entry in entries]
+        file_list = list(zip(get_entry_times(entries, 'st_mtime'), paths))
         self.filename_list = paths
         print('Time needed  for getting files: {0}s.'.format(time.time() - t1))
         return file_list
 
     def is_correct_file_type(self, filename):
-        is_correct_ending = False
-        for ending in self.acceptable_file_endings:
-            if filename.endswith(ending):
-                is_correct_ending = True
-                break
-        return is_correct_ending
+        return filename.endswith(tuple(self.acceptable_file_endings))
 
     def _order_file_list(self):
         t1 = time.time()
         self.ordered_file_list = self.file_list
-        self.ordered_file_list.sort(key=lambda x: x[0])
+        # sorted by time and then by path, which keeps the list searchable with bisect
+        self.ordered_file_list.sort()
+        self._file_times = {path: time_stamp for time_stamp, path in self.ordered_file_list}
 
         print('Time needed  for ordering files: {0}s.'.format(time.time() - t1))
 
@@ -77,6 +93,17 @@ class FileNameIterator(QtCore.QObject):
         self.file_list = self._get_files_list()
         self._order_file_list()
 
+    def _get_ordered_index(self, path):
+        """
+        Returns the index of path in ordered_file_list, raises a ValueError if it is not in the list.
+        The time stamp is taken from _file_times, the file itself is not stat'ed again.
+        """
+        entry = (self._file_times.get(path), path)
+        ind = bisect.bisect_left(self.ordered_file_list, entry) if entry[0] is not None else len(self.ordered_file_list)
+        if ind == len(self.ordered_file_list) or self.ordered_file_list[ind] != entry:
+            raise ValueError('{0} is not in the ordered file list'.format(path))
+        return ind
+
 
     
 
@@ -126,10 +153,9 @@ class FileNameIterator(QtCore.QObject):
 
         elif mode == 'time':
             # (Your original time-based logic remains unchanged.)
-            time_stat = os.path.getmtime(self.complete_path)
             if not self.ordered_file_list:
                 return None
-            cur_ind = self.ordered_file_list.index((time_stat, self.complete_path))
+            cur_ind = self._get_ordered_index(self.complete_path)
             try:
                 self.complete_path = self.ordered_file_list[cur_ind + 1][1]
                 return self.complete_path
@@ -171,10 +197,9 @@ class FileNameIterator(QtCore.QObject):
             return None
 
         elif mode == 'time':
-            time_stat = os.path.getmtime(self.complete_path)
             if not self.ordered_file_list:
                 return None
-            cur_ind = self.ordered_file_list.index((time_stat, self.complete_path))
+            cur_ind = self._get_ordered_index(self.complete_path)
             if cur_ind > 0:
                 try:
                     self.complete_path = self.ordered_file_list[cur_ind - 1][1]
@@ -295,20 +320,14 @@ class FileNameIterator(QtCore.QObject):
         cur_filename_list = os.listdir(self.directory)
         cur_filename_list = [os.path.join(self.directory, filename) for filename in cur_filename_list if
                              self.is_correct_file_type(filename)]
-        new_filename_list = [filename for filename in cur_filename_list if filename not in list(self.filename_list)]
+        known_filenames = set(self.filename_list)
+        new_filename_list = [filename for filename in cur_filename_list if filename not in known_filenames]
         self.filename_list = cur_filename_list
         for filename in new_filename_list:
+            # ordered_file_list is sorted by time, new files are inserted with a binary search
             creation_time = os.path.getctime(filename)
-            if len(self.ordered_file_list) > 0:
-                if creation_time > self.ordered_file_list[-1][0]:
-                    self.ordered_file_list.append((creation_time, filename))
-                else:
-                    for ind in range(len(self.ordered_file_list)):
-                        if creation_time < self.ordered_file_list[ind][0]:
-                            self.ordered_file_list.insert(ind, (creation_time, filename))
-                            break
-            else:
-                self.ordered_file_list.append((creation_time, filename))
+            bisect.insort(self.ordered_file_list, (creation_time, filename))
+            self._file_times[filename] = creation_time
 
     @staticmethod
     def _get_ending_number(basename):
@@ -14,6 +14,7 @@
 # OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 
+import bisect
 import os
 import re
 import time
@@ -23,6 +24,10 @@ from PyQt6 import QtCore
 from colorsys import hsv_to_rgb
 import copy
 
+from .FileNameIterator import get_entry_times
+
+_DIGIT_RE = re.compile(r'\d+')
+
 
 def increment_filename(old_file):
     """
@@ -66,6 +71,8 @@ class FileNameIterator(QtCore.QObject):
         self.directory_watcher = QtCore.QFileSystemWatcher()
         self.directory_watcher.directoryChanged.connect(self.add_new_files_to_list)
         self.create_timed_file_list = False
+        # time stamp of every path in ordered_file_list, used to find a path in the list with a binary search
+        self._file_times = {}
 
         if filename is None:
             self.complete_path = None
@@ -81,27 +88,23 @@ class FileNameIterator(QtCore.QObject):
 
     def _get_files_list(self):
         t1 = time.time()
-        filename_list = os.listdir(self.directory)
-        files = []
-        for file in filename_list:
-            if self.is_correct_file_type(file):
-                files.append(file)
-        paths = [os.path.join(self.directory, file) for file in files]
-        file_list = [(os.path.getctime(path), path) for path in paths]
+        with os.scandir(self.directory) as it:
+            entries = [entry for entry in it if self.is_correct_file_type(entry.name)]
+        paths = [entry.path for entry in entries]
+        file_list = list(zip(get_entry_times(entries, 'st_ctime'), paths))
         self.filename_list = paths
         print('Time needed  for getting files: {0}s.'.format(time.time() - t1))
         return file_list
 
     def is_correct_file_type(self, filename):
-        for ending in self.acceptable_file_endings:
-            if filename.endswith(ending):
-                return True
-        return False
+        return filename.endswith(tuple(self.acceptable_file_endings))
 
     def _order_file_list(self):
         t1 = time.time()
         self.ordered_file_list = self.file_list
-        self.ordered_file_list.sort(key=lambda x: x[0])
+        # sorted by time and then by path, which keeps the list searchable with bisect
+        self.ordered_file_list.sort()
+        self._file_times = {path: time_stamp for time_stamp, path in self.ordered_file_list}
 
         print('Time needed  for ordering files: {0}s.'.format(time.time() - t1))
 
@@ -109,13 +112,24 @@ class FileNameIterator(QtCore.QObject):
         self.file_list = self._get_files_list()
         self._order_file_list()
 
+    def _get_ordered_index(self, path):
+        """
+        Returns the index of path in ordered_file_list, raises a ValueError if it is not in the list.
+        The time stamp is taken from _file_times, the file itself is not stat'ed again.
+        """
+        entry = (self._file_times.get(path), path)
+        ind = bisect.bisect_left(self.ordered_file_list, entry) if entry[0] is not None else len(self.ordered_file_list)
+        if ind == len(self.ordered_file_list) or self.ordered_file_list[ind] != entry:
+            raise ValueError('{0} is not in the ordered file list'.format(path))
+        return ind
+
     def _iterate_file_number(self, path, step, pos=None):
         directory, file_str = os.path.split(path)
-        pattern = re.compile(r'\d+')
-
-        match_iterator = pattern.finditer(file_str)
 
-        for ind, match in enumerate(reversed(list(match_iterator))):
+        # the digit groups are tried from right to left until an existing file is found
+        for ind, match in enumerate(reversed(list(_DIGIT_RE.finditer(file_str)))):
+            if pos is not None and ind != pos:
+                continue
             number_span = match.span()
             left_ind = number_span[0]
             right_ind = number_span[1]
@@ -126,25 +140,16 @@ class FileNameIterator(QtCore.QObject):
                 len=right_ind - left_ind,
                 right_str=file_str[right_ind:]
             )
-            if pos is None:
-                new_complete_path = os.path.join(directory, new_file_str)
-                if os.path.exists(new_complete_path):
-                    self.complete_path = new_complete_path
-                    return new_complete_path
-            elif ind == pos:
-                new_complete_path = os.path.join(directory, new_file_str)
-                if os.path.exists(new_complete_path):
-                    self.complete_path = new_complete_path
-                    return new_complete_path
+            new_complete_path = os.path.join(directory, new_file_str)
+            if os.path.exists(new_complete_path):
+                self.complete_path = new_complete_path
+                return new_complete_path
         return None
 
     def _iterate_folder_number(self, path, step, mec_mode=False):
         directory_str, file_str = os.path.split(path)
-        pattern = re.compile(r'\d+')
-
-        match_iterator = pattern.finditer(directory_str)
 
-        for ind, match in enumerate(reversed(list(match_iterator))):
+        for ind, match in enumerate(reversed(list(_DIGIT_RE.finditer(directory_str)))):
             number_span = match.span()
             left_ind = number_span[0]
             right_ind = number_span[1]
@@ -157,8 +162,7 @@ class FileNameIterator(QtCore.QObject):
             )
             print(mec_mode)
             if mec_mode:
-                match_file_iterator = pattern.finditer(file_str)
-                for ind_file, match_file in enumerate(reversed(list(match_file_iterator))):
+                for ind_file, match_file in enumerate(reversed(list(_DIGIT_RE.finditer(file_str)))):
                     if ind_file != 2:
                         continue
                     number_span = match_file.span()
@@ -187,8 +191,7 @@ class FileNameIterator(QtCore.QObject):
             return None
 
         if mode == 'time':
-            time_stat = os.path.getctime(self.complete_path)
-            cur_ind = self.ordered_file_list.index((time_stat, self.complete_path))
+            cur_ind = self._get_ordered_index(self.complete_path)
             # cur_ind = self.ordered_file_list.index(self.complete_path)
             try:
                 self.complete_path = self.ordered_file_list[cur_ind + step][1]
@@ -219,8 +222,7 @@ class FileNameIterator(QtCore.QObject):
             return None
 
         if mode == 'time':
-            time_stat = os.path.getctime(self.complete_path)
-            cur_ind = self.ordered_file_list.index((time_stat, self.complete_path))
+            cur_ind = self._get_ordered_index(self.complete_path)
             # cur_ind = self.ordered_file_list.index(self.complete_path)
             if cur_ind > 0:
                 try:
@@ -273,20 +275,14 @@ class FileNameIterator(QtCore.QObject):
         cur_filename_list = os.listdir(self.directory)
         cur_filename_list = [os.path.join(self.directory, filename) for filename in cur_filename_list if
                              self.is_correct_file_type(filename)]
-        new_filename_list = [filename for filename in cur_filename_list if filename not in list(self.filename_list)]
+        known_filenames = set(self.filename_list)
+        new_filename_list = [filename for filename in cur_filename_list if filename not in known_filenames]
         self.filename_list = cur_filename_list
         for filename in new_filename_list:
+            # ordered_file_list is sorted by time, new files are inserted with a binary search
             creation_time = os.path.getctime(filename)
-            if len(self.ordered_file_list) > 0:
-                if creation_time > self.ordered_file_list[-1][0]:
-                    self.ordered_file_list.append((creation_time, filename))
-                else:
-                    for ind in range(len(self.ordered_file_list)):
-                        if creation_time < self.ordered_file_list[ind][0]:
-                            self.ordered_file_list.insert(ind, (creation_time, filename))
-                            break
-            else:
-                self.ordered_file_list.append((creation_time, filename))
+            bisect.insort(self.ordered_file_list, (creation_time, filename))
+            self._file_times[filename] = creation_time
 
 
 def rotate_matrix_m90(matrix):
@@ -342,6 +338,26 @@ def get_partial_index(array, value):
     return new_pos
 
 
+def get_partial_index_sorted(array, value):
+    """
+    Same as get_partial_index but for a monotonically increasing array. Uses a binary search instead of scanning
+    the whole array and accepts several values at once.
+    :param array: ascending numpy array
+    :param value: value or array of values for which to get the index
+    :return: partial index, None if value is outside of the array range. For an array of values an array of
+             partial indices is returned with NaN for values outside of the array range.
+    """
+    value = np.asarray(value, dtype=float)
+    upper_ind = np.clip(np.searchsorted(array, value), 1, len(array) - 1)
+    lower_ind = upper_ind - 1
+    new_pos = lower_ind + (value - array[lower_ind]) / (array[upper_ind] - array[lower_ind])
+    new_pos = np.where((value < array[0]) | (value > array[-1]), np.nan, new_pos)
+
+    if new_pos.ndim == 0:
+        return None if np.isnan(new_pos) else float(new_pos)
+    return new_pos
+
+
 def get_partial_value(array, ind):
     """
     Calculates the value for a non-integer array from an array using linear interpolation.
@@ -394,7 +410,8 @@ def getInterpolatedCounts(value, array):
     reversed_array = array[0] > array[1]
     if reversed_array:
         array = np.flip(array)
-    p = next(ii for ii,v in enumerate(array) if (v>=value))
+    # first index with array[p] >= value, binary search since the array is monotonic (np.flip is only a view)
+    p = int(np.searchsorted(array, value, side='left'))
     frac=p-1.0+(float(value) - array[p-1])/(array[p]-array[p-1])
     n_chan = len(array)
     if reversed_array:
@@ -0,0 +1,151 @@
+# -*- coding: utf8 -*-
+# PyRadiant - GUI program for analysis of thermal spectra during
+# laser heated diamond anvil cell experiments
+# Copyright (C) 2024 Ross Hrubiak (hrubiak@anl.gov)
+# High Pressure Collaborative Access Team, Argonne National Laboratory
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import numpy as np
+
+NUMBA_INSTALLED = False
+try:
+    import numba
+    NUMBA_INSTALLED = True
+except ImportError:
+    pass
+
+
+if NUMBA_INSTALLED:
+
+    @numba.njit(cache=True)
+    def _clip_to_nan(a, lo, hi):
+        for i in range(a.shape[0]):
+            v = a[i]
+            if v <= lo or v > hi:
+                a[i] = np.nan
+
+    @numba.njit(cache=True)
+    def _mask_to_nan(y, mask, keep):
+        y_max = -np.inf
+        has_nan = False
+        has_value = False
+        for i in range(y.shape[0]):
+            v = y[i]
+            if v != v:
+                has_nan = True
+            elif v > y_max:
+                y_max = v
+            if mask[i] != keep:
+                y[i] = np.nan
+            elif v == v:
+                has_value = True
+        if has_nan:
+            y_max = np.nan
+        return y_max, has_value
+
+    @numba.njit(cache=True)
+    def _column_sums(img, sums):
+        # sums is preallocated by the caller, int64 for integer images so pixels are summed in their native type
+        n_rows, n_cols = img.shape
+        for i in range(n_rows):
+            for j in range(n_cols):
+                sums[j] += img[i, j]
+        return sums
+
+    @numba.njit(cache=True)
+    def _column_stats(img, limit, sums):
+        n_rows, n_cols = img.shape
+        column_max = img[0].copy()
+        for i in range(n_rows):
+            for j in range(n_cols):
+                v = img[i, j]
+                sums[j] += v
+                column_max[j] = max(column_max[j], v)
+        return sums / n_rows, column_max <= limit, column_max.max()
+
+    @numba.njit(cache=True)
+    def _column_stats_bg(img, bg_img, limit, sums, bg_sums):
+        means, within_limit, img_max = _column_stats(img, limit, sums)
+        bg_sums = _column_sums(bg_img, bg_sums)
+        n_rows = bg_img.shape[0]
+        for j in range(means.shape[0]):
+            means[j] -= bg_sums[j] / n_rows
+        return means, within_limit, img_max
+
+
+def _accumulator(img):
+    return np.zeros(img.shape[1], dtype=np.int64 if img.dtype.kind in 'ui' else np.float64)
+
+
+def clip_to_nan(a, lo, hi):
+    """
+    Sets all values of a 1d float array which are <= lo or > hi to NaN, in place.
+    Uses a single-pass numba kernel when numba is installed.
+    :param a: 1d float numpy array
+    :param lo: lower limit, values <= lo are masked
+    :param hi: upper limit, values > hi are masked
+    :return: the same array
+    """
+    if NUMBA_INSTALLED and a.ndim == 1 and a.dtype.kind == 'f':
+        _clip_to_nan(a, lo, hi)
+    else:
+        np.putmask(a, (a <= lo) | (a > hi), np.nan)
+    return a
+
+
+def mask_to_nan(y, mask, keep=True):
+    """
+    Sets all values of a 1d float array for which mask is not equal to keep to NaN, in place, and returns the maximum
+    of the array before masking. Uses a single-pass numba kernel when numba is installed.
+    :param y: 1d float numpy array
+    :param mask: 1d bool array with the same length as y
+    :param keep: values where mask == keep are kept
+    :return: maximum of y before masking (NaN if y contains NaN), whether any non NaN value is left
+    """
+    if NUMBA_INSTALLED and y.ndim == 1 and y.size and y.dtype.kind == 'f' and mask.shape == y.shape:
+        return _mask_to_nan(y, mask.astype(np.bool_, copy=False), keep)
+    y_max = np.amax(y) if len(y) else -np.inf
+    y[mask != keep] = np.nan
+    return y_max, not np.all(np.isnan(y))
+
+
+def column_stats(img, limit):
+    """
+    Computes the column means, the columns without any value above limit and the maximum of a 2d array.
+    Uses a single pass numba kernel when numba is installed, instead of one numpy pass per result. Integer images
+    are summed as int64 and not promoted to float before the division.
+    :param img: 2d numpy array
+    :param limit: columns with any value > limit are flagged as False
+    :return: column means (1d float array), within limit mask (1d bool array), maximum value
+    """
+    if NUMBA_INSTALLED and img.ndim == 2 and img.size and img.dtype.kind in 'uif':
+        return _column_stats(img, limit, _accumulator(img))
+    return np.sum(img, 0) / img.shape[0], ~np.any(img > limit, axis=0), np.max(img)
+
+
+def column_stats_bg(img, bg_img, limit):
+    """
+    Same as column_stats, but additionally subtracts the column means of bg_img from the column means of img.
+    With numba installed the signal and background rows are reduced within one compiled call.
+    :param img: 2d numpy array
+    :param bg_img: 2d numpy array with the same number of columns as img
+    :param limit: columns of img with any value > limit are flagged as False
+    :return: background subtracted column means, within limit mask of img, maximum value of img
+    """
+    if NUMBA_INSTALLED and img.ndim == 2 and img.size and bg_img.size and img.dtype.kind in 'uif' \
+            and img.dtype == bg_img.dtype and img.shape[1] == bg_img.shape[1]:
+        return _column_stats_bg(img, bg_img, limit, _accumulator(img), _accumulator(bg_img))
+    means, within_limit, img_max = column_stats(img, limit)
+    return means - np.sum(bg_img, 0) / bg_img.shape[0], within_limit, img_max
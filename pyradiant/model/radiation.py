@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 import numpy as np
 
 from scipy import stats
@@ -47,9 +49,21 @@ def wien_approximation(wavelength, temperature_K):
     
     return spectral_radiance
 
-def wien_pre_transform(wavelength_m, radiance):
+def wien_wavelength_terms(wavelength_m):
+    """
+    Radiance independent part of wien_pre_transform, it only depends on the wavelength calibration and can
+    therefore be computed once and reused for every frame.
+    :return: x values and the wavelength dependent offset of the y values
+    """
     x = 0.0143878 / wavelength_m
-    y = 36.6666 + (np.log(wavelength_m)*5+ np.log(radiance))
+    y_offset = 36.6666 + np.log(wavelength_m)*5
+    return x, y_offset
+
+def wien_pre_transform(wavelength_m, radiance, wavelength_terms=None):
+    if wavelength_terms is None:
+        wavelength_terms = wien_wavelength_terms(wavelength_m)
+    x, y_offset = wavelength_terms
+    y = y_offset + np.log(radiance)
     return x, y
 
 def inverse_wien_pre_transform(wavelength_m, y):
@@ -57,32 +71,43 @@ def inverse_wien_pre_transform(wavelength_m, y):
     radiance = np.exp(y - 36.6666 - np.log(wavelength_m)*5)
     return radiance
 
+@lru_cache(maxsize=None)
+def _t_critical(degrees_of_freedom, confidence_level=0.95):
+    # two-tailed t value, the same few degrees of freedom are requested for every frame
+    return np.abs(stats.t.ppf((1 - (1 - confidence_level) / 2), degrees_of_freedom))
+
 def fit_linear(x, y, compute_eror = True):
-    X = np.vstack([x, np.ones(len(x))]).T
-    Y = np.array(y)
-    m, b = np.linalg.lstsq(X, Y, rcond=None)[0]
+    """
+    Least squares fit of y = m * x + b, solved in closed form with centered sums.
+    :return: m, b and (if compute_eror) the 95% confidence interval of m, 0 otherwise
+    """
+    x = np.asarray(x, dtype=float)
+    Y = np.asarray(y, dtype=float)
+    n = len(x)  # Number of data points
+
+    x_mean = np.mean(x)
+    y_mean = np.mean(Y)
+    dx = x - x_mean
+    sxx = np.dot(dx, dx)
+    m = np.dot(dx, Y - y_mean) / sxx
+    b = y_mean - m * x_mean
 
     if not compute_eror:
         return m, b, 0
     else:
-        # Calculate the predicted Y values
-        Y_pred = m * x + b
-
         # Calculate the residuals
-        residuals = Y - Y_pred
+        residuals = Y - (m * x + b)
         # Calculate the sum of squared residuals
-        ssr = np.sum(residuals**2)
-
-        # Calculate the standard error of the regression slope (m)
-        n = len(X)  # Number of data points
-        std_error_m = np.sqrt(ssr / (n - 2)) / np.sqrt(np.sum((X - np.mean(X))**2))
+        ssr = np.dot(residuals, residuals)
 
-        # Assuming a 95% confidence interval (two-tailed)
-        confidence_level = 0.95
-        t_critical = np.abs(stats.t.ppf((1 - (1 - confidence_level) / 2), n - 2))
+        # Calculate the standard error of the regression slope (m), the spread is taken over the design matrix
+        # [x, 1] as a whole
+        X_mean = (x_mean * n + n) / (2 * n)
+        X_spread = np.sum((x - X_mean)**2) + n * (1 - X_mean)**2
+        std_error_m = np.sqrt(ssr / (n - 2)) / np.sqrt(X_spread)
 
-        # Calculate the standard deviation of m
-        std_deviation_m = std_error_m * t_critical
+        # Calculate the standard deviation of m, assuming a 95% confidence interval (two-tailed)
+        std_deviation_m = std_error_m * _t_critical(n - 2)
 
         return m, b, std_deviation_m
 
@@ -0,0 +1,19 @@
+# -*- coding: utf8 -*-
+# PyRadiant - GUI program for analysis of thermal spectra during
+# laser heated diamond anvil cell experiments
+# Copyright (C) 2024 Ross Hrubiak (hrubiak@anl.gov)
+# High Pressure Collaborative Access Team, Argonne National Laboratory
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
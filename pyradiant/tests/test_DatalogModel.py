@@ -0,0 +1,87 @@
+# -*- coding: utf8 -*-
+# PyRadiant - GUI program for analysis of thermal spectra during
+# laser heated diamond anvil cell experiments
+# Copyright (C) 2024 Ross Hrubiak (hrubiak@anl.gov)
+# High Pressure Collaborative Access Team, Argonne National Laboratory
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from ..model.DatalogModel import DatalogModel
+from ..model.TemperatureModel import LOG_HEADER
+
+
+def log_line(file_name, path, T_DS, T_US):
+    return '\t'.join([file_name, '0', path, str(T_DS), str(T_US), '10', '12', 'PIXIS', '1.0', '1', '1', '1',
+                      '100', '200']) + '\n'
+
+
+class DatalogModelTest(unittest.TestCase):
+    def setUp(self):
+        self.model = DatalogModel()
+        self.temp_dir = tempfile.mkdtemp()
+        self.log_path = os.path.join(self.temp_dir, 'T_log.txt')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def write_log(self, lines):
+        with open(self.log_path, 'w') as log_file:
+            log_file.write(LOG_HEADER)
+            log_file.writelines(lines)
+
+    def test_load_last_n_records(self):
+        self.write_log([log_line('run_{}.spe'.format(i), '/data', 2000 + i, 2100 + i) for i in range(10)])
+        records = self.model.load_last_n_records(self.log_path, 3)
+        self.assertEqual(records.shape, (3, 2))
+        np.testing.assert_array_equal(records[:, 0], [2007, 2008, 2009])
+        np.testing.assert_array_equal(records[:, 1], [2107, 2108, 2109])
+
+    def test_load_last_n_records_skips_repeated_header(self):
+        self.write_log([log_line('run_1.spe', '/data', 2000, 2100), LOG_HEADER,
+                        log_line('run_2.spe', '/data', 2001, 2101)])
+        records = self.model.load_last_n_records(self.log_path, 10)
+        np.testing.assert_array_equal(records, [[2000, 2100], [2001, 2101]])
+
+    def test_load_last_n_records_with_hash_in_file_name_and_path(self):
+        self.write_log([log_line('run#1.spe', '/data/#3', 2000, 2100),
+                        log_line('run#2.spe', '/x', 2001, 2101)])
+        records = self.model.load_last_n_records(self.log_path, 10)
+        np.testing.assert_array_equal(records, [[2000, 2100], [2001, 2101]])
+
+    def test_load_last_n_records_of_empty_log(self):
+        self.write_log([])
+        records = self.model.load_last_n_records(self.log_path, 10)
+        self.assertEqual(records.shape, (0, 2))
+
+    def test_add_record(self):
+        for i in range(3):
+            self.model.add_record({'# File': 'run_{}.spe'.format(i), 'Path': '/data', 'T_DS': 2000 + i,
+                                   'T_US': 2100 + i, 'T_DS_error': 10, 'T_US_error': 12, 'Detector': 'PIXIS',
+                                   'Exposure Time [sec]': 1.0, 'Gain': 1, 'scaling_DS': 1, 'scaling_US': 1,
+                                   'counts_DS': 100, 'counts_US': 200})
+        T_DS, T_US = self.model.get_temperatures()
+        np.testing.assert_array_equal(T_DS, [2000, 2001, 2002])
+        np.testing.assert_array_equal(T_US, [2100, 2101, 2102])
+
+        self.model.clear_log()
+        T_DS, T_US = self.model.get_temperatures()
+        self.assertEqual(len(T_DS), 0)
+        self.assertEqual(len(T_US), 0)
@@ -84,20 +84,26 @@ class historyPlotWidget(pg.GraphicsLayoutWidget):
 
 
     def create_data_items(self):
+        # line and symbols share one pen/brush per color, the items keep them across setData calls
+        self._ds_pen = pg.mkPen(QColor(colors['downstream']), width=1)
+        self._ds_brush = pg.mkBrush(QColor(colors['downstream']))
+        self._us_pen = pg.mkPen(QColor(colors['upstream']), width=1)
+        self._us_brush = pg.mkBrush(QColor(colors['upstream']))
+
         self._time_lapse_ds_data_item = pg.PlotDataItem(
-            pen=pg.mkPen(QColor(colors['downstream']), width=1),
-            brush=pg.mkBrush(QColor(colors['downstream'])),
-            symbolPen=pg.mkPen(QColor(colors['downstream']), width=1),
-            symbolBrush=pg.mkBrush(QColor(colors['downstream'])),
+            pen=self._ds_pen,
+            brush=self._ds_brush,
+            symbolPen=self._ds_pen,
+            symbolBrush=self._ds_brush,
             size=1,
             symbolSize=5,
             symbol='s'
         )
         self._time_lapse_us_data_item = pg.PlotDataItem(
-            pen=pg.mkPen(QColor(colors['upstream']), width=1),
-            brush=pg.mkBrush(QColor(colors['upstream'])),
-            symbolPen=pg.mkPen(QColor(colors['upstream']), width=1),
-            symbolBrush=pg.mkBrush(QColor(colors['upstream'])),
+            pen=self._us_pen,
+            brush=self._us_brush,
+            symbolPen=self._us_pen,
+            symbolBrush=self._us_brush,
             size=1,
             symbolSize=5,
             symbol='s'
@@ -110,16 +116,16 @@ class historyPlotWidget(pg.GraphicsLayoutWidget):
         self._time_lapse_plot.addItem(self._time_lapse_us_data_item)
         self._time_lapse_plot.addItem(self.cursor_item)
 
-    def plot_ds_time_lapse(self, x, y):
-        if len(x) > 0 and not np.all(np.isnan(y)):
-            
-            self._time_lapse_ds_data_item.setData(x, y)
+    def plot_ds_time_lapse(self, y):
+        # x is the entry index, pyqtgraph generates it when only y is given
+        if len(y) > 0 and not np.all(np.isnan(y)):
+            self._time_lapse_ds_data_item.setData(y)
         else:
             self._time_lapse_ds_data_item.setData([], [])
 
-    def plot_us_time_lapse(self, x, y):
-        if len(x) > 0 and not np.all(np.isnan(y)):
-            self._time_lapse_us_data_item.setData(x, y)
+    def plot_us_time_lapse(self, y):
+        if len(y) > 0 and not np.all(np.isnan(y)):
+            self._time_lapse_us_data_item.setData(y)
         else:
             self._time_lapse_us_data_item.setData([], [])
 
@@ -30,6 +30,7 @@ from .. import icons_path
 
 
 class MainWidget(QtWidgets.QMainWindow):
+    closing = QtCore.pyqtSignal()
     def __init__(self, *args, **kwargs):
         super().__init__()
         self._centeral_widget = QtWidgets.QWidget()
@@ -48,6 +49,13 @@ class MainWidget(QtWidgets.QMainWindow):
         self.setCentralWidget(self._centeral_widget)
         self.resize(1300,700)
 
+    def closeEvent(self, e):
+        """
+        Accepts the close event, saving settings etc. is done by whoever is connected to the closing signal
+        """
+        e.accept()
+        self.closing.emit()
+
 
      
 
@@ -17,7 +17,6 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
-from functools import partial
 import os
 import numpy as np
 
@@ -31,9 +30,14 @@ from .CustomWidgets import HorizontalSpacerItem, VerticalSpacerItem, DoubleSpinB
 #from .HistogramLUTItem import HistogramLUTItem
 
 from .Widgets import StatusBar
+from ..model.helper.numeric import NUMBA_INSTALLED
 
 from .. import resources_path
 
+if NUMBA_INSTALLED:
+    # float images are then rescaled onto the lookup table by pyqtgraph's compiled kernels
+    pg.setConfigOption('useNumba', True)
+
 '''#pg.setConfigOption('useOpenGL', False)
 pg.setConfigOption('leftButtonPan', False)
 pg.setConfigOption('background', (20, 20, 20))
@@ -50,6 +54,22 @@ colors = {
 }
 
 
+def set_value_if_changed(spin_box, value):
+    """
+    Sets the value of a spin box only if it differs, setValue always reformats and repaints the text.
+    """
+    if spin_box.value() != value:
+        spin_box.setValue(value)
+
+
+def set_text_if_changed(line_edit, text):
+    """
+    Sets the text of a line edit only if it differs, setText always repaints the field.
+    """
+    if line_edit.text() != text:
+        line_edit.setText(text)
+
+
 class RoiWidget(QtWidgets.QWidget):
     rois_changed = QtCore.pyqtSignal(list)
     wl_range_changed = QtCore.pyqtSignal(list)
@@ -118,7 +138,7 @@ class RoiWidget(QtWidgets.QWidget):
             row = ind % 2
             col = ind // 2
             self.roi_gbs.append(RoiGroupBox(self.roi_titles[ind], self.roi_colors[ind]))
-            self.roi_gbs[-1].roi_txt_changed.connect(partial(self._update_img_roi, ind))
+            self.roi_gbs[-1].roi_txt_changed.connect(lambda roi_list, i=ind: self._update_img_roi(i, roi_list))
             self._roi_gbs_layout.addWidget(self.roi_gbs[-1], row, col)
 
     def create_signals(self):
@@ -126,16 +146,19 @@ class RoiWidget(QtWidgets.QWidget):
         self.wl_range_widget.wl_start.editingFinished.connect(self.wl_range_widget_editingFinished_callback)
         self.wl_range_widget.wl_end.editingFinished.connect(self.wl_range_widget_editingFinished_callback)
 
+    @QtCore.pyqtSlot()
     def wl_range_widget_editingFinished_callback(self):
-        wl_range = [int(round(float(str(self.wl_range_widget.wl_start.text())))),int(round(float(str(self.wl_range_widget.wl_end.text()))))]
+        # the QIntValidator of the fields only lets editingFinished through for integer text
+        wl_range = [int(self.wl_range_widget.wl_start.text() or 0), int(self.wl_range_widget.wl_end.text() or 0)]
         self.wl_range_changed.emit(wl_range)
     
     def set_wl_range(self, wl_range):
         self.wl_range_widget.blockSignals(True)
-        self.wl_range_widget.wl_start.setText(str(wl_range[0]))
-        self.wl_range_widget.wl_end.setText(str(wl_range[1]))
+        set_text_if_changed(self.wl_range_widget.wl_start, str(wl_range[0]))
+        set_text_if_changed(self.wl_range_widget.wl_end, str(wl_range[1]))
         self.wl_range_widget.blockSignals(False)
 
+    @QtCore.pyqtSlot(list)
     def _update_roi_gbs(self, rois_list):
         for ind, roi_gb in enumerate(self.roi_gbs):
             roi_gb.blockSignals(True)
@@ -146,10 +169,10 @@ class RoiWidget(QtWidgets.QWidget):
 
     def _update_img_roi(self, ind, roi_list):
 
-        gb_y_start = int(str(self.roi_gbs[ind].y_min_txt.text()))
-        gb_y_end = int(str(self.roi_gbs[ind].y_max_txt.text()))
+        gb_y_start = int(self.roi_gbs[ind].y_min_txt.value())
+        gb_y_end = int(self.roi_gbs[ind].y_max_txt.value())
         n = int(round(abs(gb_y_end - gb_y_start)))
-        self.roi_gbs[ind].y_n_txt.setText(str(n))
+        set_text_if_changed(self.roi_gbs[ind].y_n_txt, str(n))
         # make user horizontal range is always synched
         for gb in self.roi_gbs:
 
@@ -159,8 +182,8 @@ class RoiWidget(QtWidgets.QWidget):
             gb_x_end = int(round(float(gb.x_max_txt.value())))
             
             gb.blockSignals(True)
-            gb.x_min_txt.setValue(int(x_start))
-            gb.x_max_txt.setValue(int(x_end))
+            set_value_if_changed(gb.x_min_txt, int(x_start))
+            set_value_if_changed(gb.x_max_txt, int(x_end))
             gb.blockSignals(False)
 
         self.img_widget.blockSignals(True)
@@ -173,23 +196,25 @@ class RoiWidget(QtWidgets.QWidget):
     def set_rois(self, rois_list):
         self.blockSignals(True)
         self.roi_gb.blockSignals(True)
-        for ind in range(self.roi_num):
-            self._update_img_roi(ind, rois_list[ind])
+        # all rois are placed in one pass, the group boxes are then filled from rois_list
+        self.img_widget.blockSignals(True)
+        self.img_widget.set_all_rois(rois_list[:self.roi_num])
+        self.img_widget.blockSignals(False)
         self._update_roi_gbs(rois_list)
         
         self.blockSignals(False)
         self.roi_gb.blockSignals(False)
 
-    def get_rois(self):
-        return self.img_widget.get_roi_limits()
+    def get_rois(self, as_array=False):
+        return self.img_widget.get_roi_limits(as_array)
 
     def plot_img(self, img_data):
         if img_data is not None:
-            self.img_widget.plot_image(img_data.T)
+            self.img_widget.plot_image(img_data)
 
     def plot_raw_ccd(self, ccd_data):
         if ccd_data is not None:
-            self.ccd_widget.plot_image(ccd_data.T)
+            self.ccd_widget.plot_image(ccd_data)
 
     def add_item(self, pg_item):
         self.img_widget.pg_viewbox.addItem(pg_item)
@@ -267,10 +292,10 @@ class RoiGroupBox(QtWidgets.QGroupBox):
      
 
     def create_signals(self):
-        self.x_min_txt.valueChanged.connect(partial(self._roi_txt_changed, self.x_min_txt))
-        self.x_max_txt.valueChanged.connect(partial(self._roi_txt_changed, self.x_max_txt))
-        self.y_min_txt.valueChanged.connect(partial(self._roi_txt_changed, self.y_min_txt))
-        self.y_max_txt.valueChanged.connect(partial(self._roi_txt_changed, self.y_max_txt))
+        self.x_min_txt.valueChanged.connect(self._roi_txt_changed)
+        self.x_max_txt.valueChanged.connect(self._roi_txt_changed)
+        self.y_min_txt.valueChanged.connect(self._roi_txt_changed)
+        self.y_max_txt.valueChanged.connect(self._roi_txt_changed)
 
     def get_roi_limits(self):
         x_min = int(self.x_min_txt.value())
@@ -282,14 +307,17 @@ class RoiGroupBox(QtWidgets.QGroupBox):
 
     def update_roi_txt(self, roi_list):
         self.blockSignals(True)
-        self.x_min_txt.setValue(int(np.round(roi_list[0])))
-        self.x_max_txt.setValue(int(np.round(roi_list[1])))
-        self.y_min_txt.setValue(int(np.round(roi_list[2])))
-        self.y_max_txt.setValue(int(np.round(roi_list[3])))
-        self.y_n_txt.setText(str(int(abs(np.round(roi_list[3])-np.round(roi_list[2])))))
+        # builtin round rounds half to even like np.round, without the ufunc overhead for scalars
+        x_min, x_max, y_min, y_max = (int(round(value)) for value in roi_list[:4])
+        set_value_if_changed(self.x_min_txt, x_min)
+        set_value_if_changed(self.x_max_txt, x_max)
+        set_value_if_changed(self.y_min_txt, y_min)
+        set_value_if_changed(self.y_max_txt, y_max)
+        set_text_if_changed(self.y_n_txt, str(abs(y_max - y_min)))
         self.blockSignals(False)
 
-    def _roi_txt_changed(self, txt_box):
+    @QtCore.pyqtSlot()
+    def _roi_txt_changed(self):
         self.roi_txt_changed.emit(self.get_roi_limits())
 
 
@@ -412,6 +440,13 @@ class RoiImageWidget(QtWidgets.QWidget):
         self.roi_num = roi_num
         self.roi_colors = roi_colors
         self.rectangle = None
+        # limits returned by get_roi_limits, reset whenever a roi, the calibration or the image changes
+        self._roi_limits = None
+        # horizontal (pos, size) all rois were last synchronized to
+        self._last_sync_x = None
+        # pixels per wavelength unit of the calibrated x axis and the inverse, None without calibration or image
+        self._x_scale = None
+        self._x_inv_scale = None
         self.pg_widget = pg.GraphicsLayoutWidget()
         self.pg_layout = self.pg_widget.ci
         self.pg_layout.setContentsMargins(0, 10, 15, 0)
@@ -425,7 +460,8 @@ class RoiImageWidget(QtWidgets.QWidget):
         self.pg_layout.addItem(self.bottom_axis, 2, 1)
         self.pg_layout.addItem(self.left_axis, 1, 0)
 
-        self.pg_img_item = pg.ImageItem()
+        # images are passed in their (rows, columns) memory layout, this avoids a transposed copy for every frame
+        self.pg_img_item = pg.ImageItem(axisOrder='row-major')
       
         self.pg_viewbox.addItem(self.pg_img_item)
 
@@ -445,6 +481,12 @@ class RoiImageWidget(QtWidgets.QWidget):
 
         self.pg_hist_item.gradient.setColorMap(cmap)
 
+        # the histogram is only recomputed while the image is shown (the 2D and RAW tabs are hidden most of the
+        # time), an outdated histogram is updated in showEvent
+        self._histogram_outdated = False
+        self.pg_img_item.sigImageChanged.disconnect(self.pg_hist_item.imageChanged)
+        self.pg_img_item.sigImageChanged.connect(self._image_changed)
+
         self.pg_layout.addItem(self.pg_hist_item, 1, 2, 1, 3)
 
         self._layout = QtWidgets.QVBoxLayout()
@@ -460,6 +502,8 @@ class RoiImageWidget(QtWidgets.QWidget):
         
         if self.rectangle != rectangle:
             self.rectangle = rectangle
+            self._roi_limits = None
+            self._update_x_scale()
             self.pg_img_item.setRect(*rectangle)
             x_min = self.rectangle[0]
             x_max = self.rectangle[0]+ self.rectangle[2]
@@ -469,6 +513,14 @@ class RoiImageWidget(QtWidgets.QWidget):
                                     yMin=y_min, yMax=y_max)
             self.pg_viewbox.autoRange()
 
+    def _update_x_scale(self):
+        image = self.pg_img_item.image
+        if self.rectangle is None or image is None:
+            self._x_scale = self._x_inv_scale = None
+        else:
+            self._x_scale = image.shape[1] / self.rectangle[2]
+            self._x_inv_scale = self.rectangle[2] / image.shape[1]
+
     def add_rois(self):
         self.rois = []
         for ind in range(self.roi_num):
@@ -478,24 +530,40 @@ class RoiImageWidget(QtWidgets.QWidget):
             self.pg_viewbox.addItem(self.rois[-1])
             self.rois[-1].sigRegionChanged.connect(self.roi_changed)
 
-    def get_roi_limits(self):
+    def get_roi_limits(self, as_array=False):
+        """
+        :param as_array: if True the limits are returned as (roi_num, 4) int32 array instead of a list of lists
+        """
+        if as_array:
+            return np.rint(np.asarray(self.get_roi_limits(), dtype=float)).astype(np.int32)
+        if self._roi_limits is not None:
+            return [limit[:] for limit in self._roi_limits]
         roi_limits = []
         for roi in self.rois:
             roi_pos_x = roi.pos()[0]
             roi_size_x = roi.size()[0]
-            if self.rectangle != None:
-                roi_pos_x =   (roi_pos_x-self.rectangle[0]) *self.pg_img_item.image.shape[0] /self.rectangle[2]
-                roi_size_x = roi_size_x / self.rectangle[2]*self.pg_img_item.image.shape[0]
+            if self._x_scale is not None:
+                roi_pos_x = (roi_pos_x - self.rectangle[0]) * self._x_scale
+                roi_size_x = roi_size_x * self._x_scale
             limit = [int(round(roi_pos_x)), int(round(roi_pos_x + roi_size_x)),
                                roi.pos()[1], roi.pos()[1] + roi.size()[1]]
             roi_limits.append(limit)
+        self._roi_limits = [limit[:] for limit in roi_limits]
         return roi_limits
 
+    @QtCore.pyqtSlot(object)
     def roi_changed(self, *args):
         changed_roi = args[0]
+        self._roi_limits = None
         i = self.rois.index(changed_roi)
         changed_roi_x = [changed_roi.pos()[0], changed_roi.size()[0]]
         roi: ImgROI
+
+        if self._last_sync_x == tuple(changed_roi_x):
+            # only the vertical extent changed, the other rois are already aligned
+            self.rois_changed.emit(self.get_roi_limits())
+            return
+        self._last_sync_x = tuple(changed_roi_x)
         
         for roi in self.rois:
             roi.blockSignals(True)
@@ -514,34 +582,57 @@ class RoiImageWidget(QtWidgets.QWidget):
         self.rois_changed.emit(limits)
 
     def update_roi(self, ind, roi_limits):
-        
-
+        self._roi_limits = None
+        pos, size = self._set_roi_geometry(ind, roi_limits)
+        self._sync_roi_x(pos[0], size[0], skip_ind=ind)
+
+    def set_all_rois(self, rois_list):
+        """
+        Sets the geometry of all rois at once, the horizontal range of all rois is synchronized only once at the
+        end (to the last roi, same as calling update_roi for every roi in order).
+        """
+        self._roi_limits = None
+        pos = size = None
+        for ind, roi_limits in enumerate(rois_list):
+            pos, size = self._set_roi_geometry(ind, roi_limits)
+        if pos is not None:
+            self._sync_roi_x(pos[0], size[0], skip_ind=len(rois_list) - 1)
+
+    def _set_roi_geometry(self, ind, roi_limits):
         pos = [roi_limits[0], roi_limits[2]]
         size = [roi_limits[1] - roi_limits[0],
                                 roi_limits[3] - roi_limits[2]]
-        if self.rectangle != None:
-            pos[0] = int(round(self.rectangle[0] + pos[0] /self.pg_img_item.image.shape[0] *self.rectangle[2]))
-            size[0] = int(round(size[0] * (self.rectangle[2]/self.pg_img_item.image.shape[0])))
+        if self._x_scale is not None:
+            pos[0] = int(round(self.rectangle[0] + pos[0] * self._x_inv_scale))
+            size[0] = int(round(size[0] * self._x_inv_scale))
         
         self.rois[ind].blockSignals(True)
         self.rois[ind].setPos(pos)
         self.rois[ind].setSize(size)
         self.rois[ind].blockSignals(False)
+        return pos, size
 
-        for roi in self.rois:
+    def _sync_roi_x(self, pos_x, size_x, skip_ind=None):
+        # skip_ind is the roi whose geometry was just set, it is already at pos_x/size_x
+        for ind, roi in enumerate(self.rois):
+            if ind == skip_ind:
+                continue
             p = roi.pos()
             s = roi.size()
-            if p[0] != pos[0] or s[0] != size[0]:
+            if p[0] != pos_x or s[0] != size_x:
                 roi .blockSignals(True)
-                p[0] = pos[0]
-                s[0] = size[0]
+                p[0] = pos_x
+                s[0] = size_x
                 roi.setPos(p)
                 roi.setSize(s)
                 roi .blockSignals(False)
+        self._last_sync_x = (pos_x, size_x)
 
     def plot_image(self, data):
         
         self.pg_img_item.setImage(data)
+        self._roi_limits = None
+        self._update_x_scale()
         '''if self.rectangle != None:
             x_min = self.rectangle[0]
             x_max = self.rectangle[0]+ self.rectangle[2]
@@ -551,14 +642,27 @@ class RoiImageWidget(QtWidgets.QWidget):
                                     yMin=y_min, yMax=y_max)
         else:
             
-            x_max, y_max = data.shape
+            y_max, x_max = data.shape
             self.pg_viewbox.setLimits(xMin=0, xMax=x_max,
                                     yMin=0, yMax=y_max)
         '''
+    def _image_changed(self):
+        if self.isVisible():
+            self.pg_hist_item.imageChanged()
+        else:
+            self._histogram_outdated = True
+
+    def showEvent(self, event):
+        super(RoiImageWidget, self).showEvent(event)
+        if self._histogram_outdated:
+            self._histogram_outdated = False
+            self.pg_hist_item.imageChanged()
+
     @property
     def img_data(self):
         return self.pg_img_item.image
 
+    @QtCore.pyqtSlot(object)
     def mouseMoved(self, pos):
         pos = self.pg_img_item.mapFromScene(pos)
         self.mouse_moved.emit(pos.x(), pos.y())
@@ -575,6 +679,11 @@ class RoiImageWidget(QtWidgets.QWidget):
             self.pg_viewbox.autoRange()
         ev.accept()
 
+# mouse buttons for which hovered rois and handles accept clicks
+HOVER_BUTTONS = (QtCore.Qt.MouseButton.LeftButton, QtCore.Qt.MouseButton.RightButton,
+                 QtCore.Qt.MouseButton.MiddleButton)
+
+
 class ImgROI(pg.ROI):
 
     def __init__(self, pos, size, pen, active_pen):
@@ -597,16 +706,18 @@ class ImgROI(pg.ROI):
         if not ev.isExit():
             if ev.acceptDrags(QtCore.Qt.MouseButton.LeftButton):
                 hover = True
-            for btn in [QtCore.Qt.MouseButton.LeftButton, QtCore.Qt.MouseButton.RightButton, QtCore.Qt.MouseButton.MiddleButton]:
+            for btn in HOVER_BUTTONS:
                 # Check if the acceptedMouseButtons mask includes the button
                 if (self.acceptedMouseButtons() & btn) and ev.acceptClicks(btn):
                     hover = True
 
-        if hover:
-            self.currentPen = self.active_pen
-        else:
-            self.currentPen = self.pen
-        self.update()
+        # hover events arrive with every mouse move, the roi is only repainted when its pen changes
+        self._set_current_pen(self.active_pen if hover else self.pen)
+
+    def _set_current_pen(self, pen):
+        if self.currentPen is not pen:
+            self.currentPen = pen
+            self.update()
 
     def addHandle(self, info, index=None):
         h = super(ImgROI, self).addHandle(info, index)
@@ -627,23 +738,25 @@ class CustomHandle(pg.graphicsItems.ROI.Handle):
         if not ev.isExit():
             if ev.acceptDrags(QtCore.Qt.MouseButton.LeftButton):
                 hover = True
-            for btn in [QtCore.Qt.MouseButton.LeftButton, QtCore.Qt.MouseButton.RightButton, QtCore.Qt.MouseButton.MiddleButton]:
+            for btn in HOVER_BUTTONS:
                 if (self.acceptedMouseButtons() & btn) and ev.acceptClicks(btn):
                     hover = True
 
-        if hover:
-            self.currentPen = self.activePen
-        else:
-            self.currentPen = self.pen
-        self.update()
+        self._set_current_pen(self.activePen if hover else self.pen)
+
+    def _set_current_pen(self, pen):
+        if self.currentPen is not pen:
+            self.currentPen = pen
+            self.update()
 
     def mouseDragEvent(self, ev):
         super(CustomHandle, self).mouseDragEvent(ev)
+        pen = self.currentPen
         if ev.isFinish():
-            self.currentPen = self.pen
+            pen = self.pen
         elif ev.isStart():
-            self.currentPen = self.activePen
+            pen = self.activePen
 
         if self.isMoving:  ## note: isMoving may become False in mid-drag due to right-click.
-            self.currentPen = self.activePen
-        self.update()
+            pen = self.activePen
+        self._set_current_pen(pen)
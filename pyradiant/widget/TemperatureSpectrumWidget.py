@@ -18,6 +18,8 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import os
+from concurrent.futures import ThreadPoolExecutor
+
 from PyQt6 import QtWidgets, QtCore, QtGui
 
 from PyQt6.QtGui import QColor, QIcon
@@ -28,10 +30,49 @@ import numpy as np
 
 from PyQt6.QtCore import pyqtSignal
 from .CustomWidgets import HorizontalSpacerItem, VerticalSpacerItem
+from ..model.helper.numeric import mask_to_nan
 
 
 from .. import resources_path
 
+# writes exported graphs to disk, so that png encoding and file io do not block the gui
+_graph_writer = ThreadPoolExecutor(max_workers=1)
+
+
+def _write_file(filename, data):
+    with open(filename, 'wb') as f:
+        f.write(data)
+
+
+def _save_image(image, filename):
+    # QImage.save does not raise, it only returns False if the file could not be written
+    if not image.save(filename):
+        raise OSError("Could not write image file {}".format(filename))
+
+
+def set_label_text(label_item, text, **opts):
+    """
+    Sets the text of a pg.LabelItem, skipping the html re-rendering and re-layout if the text did not change.
+    The style options of a given label are constant in this widget, therefore only the text is compared.
+    """
+    if label_item.text == text:
+        return
+    label_item.setText(text, **opts)
+
+
+def set_plot_data(data_item, x, y):
+    """
+    Sets the data of a pg.PlotDataItem or pg.PlotCurveItem, skipping the curve rebuild and repaint if x and y equal the plotted data,
+    e.g. when the fit of the other side or of an unchanged frame is replotted.
+    """
+    if data_item.xData is None:
+        if len(x) == 0:
+            return
+    elif np.array_equal(data_item.xData, x) and np.array_equal(data_item.yData, y, equal_nan=True):
+        return
+    data_item.setData(x, y)
+
+
 pg.setConfigOption('leftButtonPan', False)
 pg.setConfigOption('background', 'k')
 pg.setConfigOption('foreground', 'w')
@@ -54,6 +95,8 @@ export_colors = {
 
 class TemperatureSpectrumWidget(QtWidgets.QWidget):
     mouse_moved = QtCore.pyqtSignal(float, float)
+    # filename and error message of a graph that could not be written, emitted from the graph writer thread
+    graph_save_failed = QtCore.pyqtSignal(str, str)
 
     def __init__(self, *args, **kwargs):
         super(TemperatureSpectrumWidget, self).__init__(*args, **kwargs)
@@ -70,58 +113,23 @@ class TemperatureSpectrumWidget(QtWidgets.QWidget):
 
     def create_plot_items(self):
         
-        self._pg_us_layout_widget = pg.GraphicsLayoutWidget()
-        self._pg_us_layout = pg.GraphicsLayout()
-        self._pg_us_layout.setContentsMargins(0, 0, 0, 0)
-        self._pg_us_layout.layout.setVerticalSpacing(0)
-        
-        us_vb = CustomViewBox() 
-        self._us_plot =pg.PlotItem(viewBox=us_vb)
+        # both plots share one scene, so an update repaints a single view
+        self.plots_widget = pg.GraphicsLayoutWidget()
+
+        self._pg_us_layout, self._us_plot = self._create_spectrum_plot("Upstream", colors['upstream'])
         self._us_view_box = self._us_plot.getViewBox()
-        
-        self._us_plot.showAxis('top', show=True)
-        self._us_plot.showAxis('right', show=True)
-        self._us_plot.getAxis('top').setStyle(showValues=False)
-        self._us_plot.getAxis('right').setStyle(showValues=False)
-        self._us_plot.getAxis('left').setStyle(showValues=False)
-        self._us_plot.setTitle("Upstream", color=QColor(colors['upstream']), size='20pt')
-        self._us_plot.setLabel('bottom', '&lambda; (nm)')
-        self._us_plot.setMinimumWidth(120)
-        
-        self._us_plot.setSizePolicy(QtWidgets.QSizePolicy.Policy.Expanding, QtWidgets.QSizePolicy.Policy.Expanding)
-        self._pg_us_layout.addItem(self._us_plot)
-        self._pg_us_layout_widget.addItem(self._pg_us_layout)
-        
-        self._pg_ds_layout_widget = pg.GraphicsLayoutWidget()
-        self._pg_ds_layout = pg.GraphicsLayout()
-        self._pg_ds_layout.setContentsMargins(0, 0, 0, 0)
-        self._pg_ds_layout.layout.setVerticalSpacing(0)
 
-        ds_vb = CustomViewBox() 
-        self._ds_plot = pg.PlotItem(viewBox=ds_vb)
+        self._pg_ds_layout, self._ds_plot = self._create_spectrum_plot("Downstream", colors['downstream'])
         self._ds_view_box = self._ds_plot.getViewBox()
-        self._ds_plot.showAxis('top', show=True)
-        self._ds_plot.showAxis('right', show=True)
-        self._ds_plot.getAxis('top').setStyle(showValues=False)
-        self._ds_plot.getAxis('right').setStyle(showValues=False)
-        self._ds_plot.getAxis('left').setStyle(showValues=False)
-        self._ds_plot.setTitle("Downstream", color=QColor(colors['downstream']), size='20pt')
-        self._ds_plot.setLabel('bottom', '&lambda; (nm)')
-        self._ds_plot.setMinimumWidth(120)
-        
-        self._ds_plot.setSizePolicy(QtWidgets.QSizePolicy.Policy.Expanding, QtWidgets.QSizePolicy.Policy.Expanding)
-        self._pg_ds_layout.addItem(self._ds_plot)
-        self._pg_ds_layout_widget.addItem(self._pg_ds_layout)
 
         self.ds_mx = 2
         self.us_mx = 2
         
-        self.plots_widget = QtWidgets.QWidget()
-        self._plots_widget_layout = QtWidgets.QGridLayout(self.plots_widget)
-        self._plots_widget_layout.setContentsMargins(0, 0, 0, 0)
-        self._plots_widget_layout.setSpacing(0)
-        self._plots_widget_layout.addWidget(self._pg_ds_layout_widget, 0, 0)
-        self._plots_widget_layout.addWidget(self._pg_us_layout_widget, 0, 1)
+        self.plots_widget.addItem(self._pg_ds_layout, 0, 0)
+        self.plots_widget.addItem(self._pg_us_layout, 0, 1)
+        for layout in (self._pg_ds_layout, self._pg_us_layout):
+            # the titles differ in width, equal preferred widths keep both plots at the same size
+            layout.setPreferredWidth(120)
         
         self._layout.addWidget(self.plots_widget)
         
@@ -167,17 +175,40 @@ class TemperatureSpectrumWidget(QtWidgets.QWidget):
         
   
 
+    @staticmethod
+    def _create_spectrum_plot(title, color):
+        """
+        Creates the plot of one detector side, wrapped into a GraphicsLayout.
+        :return: layout, plot item
+        """
+        layout = pg.GraphicsLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.layout.setVerticalSpacing(0)
+
+        plot = pg.PlotItem(viewBox=CustomViewBox())
+        plot.showAxis('top', show=True)
+        plot.showAxis('right', show=True)
+        for axis in ('top', 'right', 'left'):
+            plot.getAxis(axis).setStyle(showValues=False)
+        plot.setTitle(title, color=QColor(color), size='20pt')
+        plot.setLabel('bottom', '&lambda; (nm)')
+        plot.setMinimumWidth(120)
+
+        plot.setSizePolicy(QtWidgets.QSizePolicy.Policy.Expanding, QtWidgets.QSizePolicy.Policy.Expanding)
+        layout.addItem(plot)
+        return layout, plot
+
     def create_data_items(self):
         # self._us_data_item = pg.ScatterPlotItem(pen=pg.mkPen(colors['data_pen'], width=1),
         #                                         brush=pg.mkBrush(colors['data_brush']),
         #                                         size=3,
         #                                         symbol ='o')
-        self._us_data_item = pg.PlotDataItem(pen=pg.mkPen("#fff", width=1.0, conntect='finite',antialias=True ))
-        self._us_data_item.setDownsampling(True)
-        self._us_masked_data_item = pg.PlotDataItem(pen=pg.mkPen("#d61cff", width=1.0, conntect='finite',antialias=True ))
-        self._us_masked_data_item.setDownsampling(True)
-        self._us_fit_item = pg.PlotDataItem(pen=pg.mkPen(colors['fit_pen'], width=4, conntect='finite',antialias=True))
-        self._us_fit_item.setDownsampling(True)
+        self._us_data_item = pg.PlotCurveItem(pen=pg.mkPen("#fff", width=1.0), connect='finite',
+                                            antialias=False)
+        self._us_masked_data_item = pg.PlotCurveItem(pen=pg.mkPen("#d61cff", width=1.0), connect='finite',
+                                                   antialias=False)
+        self._us_fit_item = pg.PlotCurveItem(pen=pg.mkPen(colors['fit_pen'], width=4), connect='finite',
+                                           antialias=True)
 
         self._us_plot.addItem(self._us_data_item)
         self._us_plot.addItem(self._us_masked_data_item)
@@ -198,12 +229,12 @@ class TemperatureSpectrumWidget(QtWidgets.QWidget):
         #                                         brush=pg.mkBrush(colors['data_brush']),
         #                                         size=3,
         #                                         symbol ='o')
-        self._ds_data_item = pg.PlotDataItem(pen=pg.mkPen("#fff", width=1.0, conntect='finite',antialias=True))
-        self._ds_data_item.setDownsampling(True)
-        self._ds_masked_data_item = pg.PlotDataItem(pen=pg.mkPen("#d61cff", width=1.0, conntect='finite',antialias=True ))
-        self._ds_masked_data_item.setDownsampling(True)
-        self._ds_fit_item = pg.PlotDataItem(pen=pg.mkPen(colors['fit_pen'], width=4, conntect='finite',antialias=True))
-        self._ds_fit_item.setDownsampling(True)
+        self._ds_data_item = pg.PlotCurveItem(pen=pg.mkPen("#fff", width=1.0), connect='finite',
+                                            antialias=False)
+        self._ds_masked_data_item = pg.PlotCurveItem(pen=pg.mkPen("#d61cff", width=1.0), connect='finite',
+                                                   antialias=False)
+        self._ds_fit_item = pg.PlotCurveItem(pen=pg.mkPen(colors['fit_pen'], width=4), connect='finite',
+                                           antialias=True)
 
         self._ds_plot.addItem(self._ds_data_item)
         self._ds_plot.addItem(self._ds_masked_data_item)
@@ -253,36 +284,42 @@ class TemperatureSpectrumWidget(QtWidgets.QWidget):
 
     def plot_ds_data(self, x, y, mask=None):
       
+        if mask is not None:
+            # masking, maximum and NaN check in a single pass
+            y_max, has_value = mask_to_nan(y, mask)
+        else:
+            y_max = np.amax(y) if len(x) > 0 else None
+            has_value = not np.all(np.isnan(y))
         if len(x)>0:
-            mx = np.amax(y)*1.1
+            mx = y_max*1.1
         else:
             mx = 1.1
         if mx < 2:
             mx = 2
         self.ds_mx = mx
 
-        if mask is not None:
-            #x[~mask] = np.nan
-            y[~mask] = np.nan
-        
-        if len(x) > 0 and not np.all(np.isnan(y)):
+        if len(x) > 0 and has_value:
             self._ds_data_item.setData(x, y)
         else:
             self._ds_data_item.setData([], [])
 
     def plot_us_data(self, x, y, mask=None):
     
+        if mask is not None:
+            # masking, maximum and NaN check in a single pass
+            y_max, has_value = mask_to_nan(y, mask)
+        else:
+            y_max = np.amax(y) if len(x) > 0 else None
+            has_value = not np.all(np.isnan(y))
         if len(x)>0:
-            mx = np.amax(y)*1.1
+            mx = y_max*1.1
         else:
             mx = 1.1
         if mx < 2:
             mx = 2
         self.us_mx = mx
-        if mask is not None:
-            #x[~mask] = np.nan
-            y[~mask] = np.nan
-        if len(x) > 0 and not np.all(np.isnan(y)):
+
+        if len(x) > 0 and has_value:
             self._us_data_item.setData(x, y)
         else:
             self._us_data_item.setData([], [])
@@ -293,79 +330,81 @@ class TemperatureSpectrumWidget(QtWidgets.QWidget):
         self._ds_view_box.setYRange(-1,mx)
 
     def plot_ds_masked_data(self, x, y, mask=None):
-       
-        if mask is not None:
-            #x[~mask] = np.nan
-            y[mask] = np.nan
-   
-        if len(x) > 0 and not np.all(np.isnan(y)):
+        # without a mask or if no point is masked there is nothing to show, the item is only cleared once
+        if mask is None or mask.all():
+            set_plot_data(self._ds_masked_data_item, [], [])
+            return
+
+        has_value = mask_to_nan(y, mask, keep=False)[1]
+        if len(x) > 0 and has_value:
             self._ds_masked_data_item.setData(x, y)
         else:
-            self._ds_masked_data_item.setData([], [])
+            set_plot_data(self._ds_masked_data_item, [], [])
 
     def plot_us_masked_data(self, x, y, mask):
-       
-        if mask is not None:
-            #x[~mask] = np.nan
-            y[mask] = np.nan
-     
-        if len(x) > 0 and not np.all(np.isnan(y)):
+        # without a mask or if no point is masked there is nothing to show, the item is only cleared once
+        if mask is None or mask.all():
+            set_plot_data(self._us_masked_data_item, [], [])
+            return
+
+        has_value = mask_to_nan(y, mask, keep=False)[1]
+        if len(x) > 0 and has_value:
             self._us_masked_data_item.setData(x, y)
         else:
-            self._us_masked_data_item.setData([], [])
+            set_plot_data(self._us_masked_data_item, [], [])
 
     def plot_ds_fit(self, x, y):
         
         if len(x) > 0 and not np.all(np.isnan(y)):
-            self._ds_fit_item.setData(x, y)
+            set_plot_data(self._ds_fit_item, x, y)
         else:
-            self._ds_fit_item.setData([], [])
+            set_plot_data(self._ds_fit_item, [], [])
 
     def plot_us_fit(self, x, y):
         
         if len(x) > 0 and not np.all(np.isnan(y)):
-            self._us_fit_item.setData(x, y)
+            set_plot_data(self._us_fit_item, x, y)
         else:
-            self._us_fit_item.setData([], [])
+            set_plot_data(self._us_fit_item, [], [])
 
     def plot_ds_time_lapse(self, x, y):
         if len(x) > 0 and not np.all(np.isnan(y)):
-            self._time_lapse_ds_data_item.setData(x, y)
+            set_plot_data(self._time_lapse_ds_data_item, x, y)
         else:
-            self._time_lapse_ds_data_item.setData([], [])
+            set_plot_data(self._time_lapse_ds_data_item, [], [])
 
     def plot_us_time_lapse(self, x, y):
         if len(x) > 0 and not np.all(np.isnan(y)):
-            self._time_lapse_us_data_item.setData(x, y)
+            set_plot_data(self._time_lapse_us_data_item, x, y)
         else:
-            self._time_lapse_us_data_item.setData([], [])
+            set_plot_data(self._time_lapse_us_data_item, [], [])
 
     def update_us_temperature_txt(self, temperature, temperature_error):
-        self._us_temperature_txt_item.setText('{0:.0f} K &plusmn; {1:.0f}'.format(temperature,
-                                                                                  temperature_error),
-                                              size='24pt',
-                                              color=colors['upstream'],
-                                              justify='left')
+        set_label_text(self._us_temperature_txt_item, '{0:.0f} K &plusmn; {1:.0f}'.format(temperature,
+                                                                                          temperature_error),
+                                                      size='24pt',
+                                                      color=colors['upstream'],
+                                                      justify='left')
 
     def update_ds_temperature_txt(self, temperature, temperature_error):
-        self._ds_temperature_txt_item.setText('{0:.0f} K &plusmn; {1:.0f}'.format(temperature,
-                                                                                  temperature_error),
-                                              size='24pt',
-                                              color=colors['downstream'],
-                                              justify='left')
+        set_label_text(self._ds_temperature_txt_item, '{0:.0f} K &plusmn; {1:.0f}'.format(temperature,
+                                                                                          temperature_error),
+                                                      size='24pt',
+                                                      color=colors['downstream'],
+                                                      justify='left')
 
     def update_us_roi_max_txt(self, roi_max, format_max=65536):
-        self._us_roi_max_txt_item.setText('Max Int {0:.0f}'.format(roi_max),
-                                          size='18pt',
-                                          color='#4DDECD',
-                                          justify='right')
+        set_label_text(self._us_roi_max_txt_item, 'Max Int {0:.0f}'.format(roi_max),
+                                                  size='18pt',
+                                                  color='#4DDECD',
+                                                  justify='right')
         self._us_intensity_indicator.set_intensity(float(roi_max) / format_max)
 
     def update_ds_roi_max_txt(self, roi_max, format_max=65536):
-        self._ds_roi_max_txt_item.setText('Max Int {0:.0f}'.format(roi_max),
-                                          size='18pt',
-                                          color='#4DDECD',
-                                          justify='left')
+        set_label_text(self._ds_roi_max_txt_item, 'Max Int {0:.0f}'.format(roi_max),
+                                                  size='18pt',
+                                                  color='#4DDECD',
+                                                  justify='left')
         self._ds_intensity_indicator.set_intensity(float(roi_max) / format_max)
 
     def show_time_lapse_plot(self, bool):
@@ -384,39 +423,52 @@ class TemperatureSpectrumWidget(QtWidgets.QWidget):
                 self.time_lapse_widget_shown = False
 
     def update_time_lapse_ds_temperature_txt(self, temperature, temperature_error):
-        self._time_lapse_ds_temperature_txt.setText('{0:.0f} K &plusmn; {1:.0f}'.format(temperature,
-                                                                                        temperature_error),
-                                                    size='16pt',
-                                                    color=colors['downstream'],
-                                                    justify='left')
+        set_label_text(self._time_lapse_ds_temperature_txt, '{0:.0f} K &plusmn; {1:.0f}'.format(temperature,
+                                                                                                temperature_error),
+                                                            size='16pt',
+                                                            color=colors['downstream'],
+                                                            justify='left')
 
     def update_time_lapse_us_temperature_txt(self, temperature, temperature_error):
-        self._time_lapse_us_temperature_txt.setText('{0:.0f} K &plusmn; {1:.0f}'.format(temperature,
-                                                                                        temperature_error),
-                                                    size='16pt',
-                                                    color=colors['upstream'],
-                                                    justify='right')
+        set_label_text(self._time_lapse_us_temperature_txt, '{0:.0f} K &plusmn; {1:.0f}'.format(temperature,
+                                                                                                temperature_error),
+                                                            size='16pt',
+                                                            color=colors['upstream'],
+                                                            justify='right')
 
     def update_time_lapse_combined_temperature_txt(self, temperature, temperature_error):
-        self._time_lapse_combined_temperature_txt.setText('{0:.0f} K &plusmn; {1:.0f}'.format(temperature,
-                                                                                              temperature_error),
-                                                          size='30pt',
-                                                          color=colors['combined'])
+        set_label_text(self._time_lapse_combined_temperature_txt, '{0:.0f} K &plusmn; {1:.0f}'.format(temperature,
+                                                                                                      temperature_error),
+                                                                  size='30pt',
+                                                                  color=colors['combined'])
 
     def save_graph(self, ds_filename, us_filename):
+        # the plots are rendered here, encoding and writing the files is done by the graph writer thread
         QtWidgets.QApplication.processEvents()
         if ds_filename.endswith('.png'):
-            exporter = ImageExporter(self._ds_plot)
-            exporter.export(ds_filename)
-            exporter = ImageExporter(self._us_plot)
-            exporter.export(us_filename)
+            for plot, filename in ((self._ds_plot, ds_filename), (self._us_plot, us_filename)):
+                image = ImageExporter(plot).export(toBytes=True)
+                self._submit_graph_write(filename, _save_image, image, filename)
         elif ds_filename.endswith('.svg'):
-            exporter = SVGExporter(self._ds_plot)
-            exporter.export(ds_filename)
-            exporter = SVGExporter(self._us_plot)
-            exporter.export(us_filename)
+            for plot, filename in ((self._ds_plot, ds_filename), (self._us_plot, us_filename)):
+                svg = SVGExporter(plot).export(toBytes=True)
+                self._submit_graph_write(filename, _write_file, filename, svg)
         QtWidgets.QApplication.processEvents()
 
+    def _submit_graph_write(self, filename, fn, *args):
+        future = _graph_writer.submit(fn, *args)
+        future.add_done_callback(lambda f, filename=filename: self._graph_write_done(filename, f))
+
+    def _graph_write_done(self, filename, future):
+        exception = future.exception()
+        if exception is not None:
+            self.graph_save_failed.emit(filename, str(exception))
+
+
+# fill of the intensity bar below and above 80 % of the maximum intensity
+_INTENSITY_OK_BRUSH = QtGui.QBrush(QtGui.QColor(0, 255, 0, 150))
+_INTENSITY_HIGH_BRUSH = QtGui.QBrush(QtGui.QColor(255, 0, 0, 150))
+
 
 class IntensityIndicator(pg.GraphicsWidget):
     def __init__(self):
@@ -427,7 +479,7 @@ class IntensityIndicator(pg.GraphicsWidget):
         self._layout = QtWidgets.QGraphicsGridLayout()
 
         self.outside_rect.setPen(pg.mkPen(color=(255, 255, 255), width=1))
-        self.inside_rect.setBrush(QtGui.QBrush(QtGui.QColor(0, 255, 0, 150)))
+        self.inside_rect.setBrush(_INTENSITY_OK_BRUSH)
 
         self.__parent = None
         self.__parentAnchor = None
@@ -461,16 +513,20 @@ class IntensityIndicator(pg.GraphicsWidget):
                                   bounding_rect.height())
 
         if self._intensity_level < 0.8:
-            set_color = QtGui.QColor(0, 255, 0, 150)
+            level_brush = _INTENSITY_OK_BRUSH
         else:
-            set_color = QtGui.QColor(255, 0, 0, 150)
+            level_brush = _INTENSITY_HIGH_BRUSH
         self.inside_rect.setRect(1,
                                  title_label_height + bounding_rect.height() * (1 - self._intensity_level) + 1,
                                  bar_width,
                                  bounding_rect.height() * self._intensity_level)
-        self.inside_rect.setBrush(QtGui.QBrush(set_color))
+        self.inside_rect.setBrush(level_brush)
 
     def set_intensity(self, intensity):
+        # geometry changes of the plot are handled by the geometryChanged connection, so an unchanged level
+        # needs no update
+        if intensity == self._intensity_level:
+            return
         self._intensity_level = intensity
         self.__geometryChanged()
 
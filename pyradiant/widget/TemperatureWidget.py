@@ -371,7 +371,7 @@ class TemperatureFitSettings(QtWidgets.QGroupBox):
 
         self._layout.addWidget(self.plank_btn)
         self._layout.addWidget(self.wien_btn)
-        self.plank_btn.setChecked(True)
+        self.wien_btn.setChecked(True)
 
         #self._layout.addSpacerItem(VerticalSpacerItem())
         self.setLayout(self._layout)
@@ -379,6 +379,9 @@ class TemperatureFitSettings(QtWidgets.QGroupBox):
 
 
 class CalibrationGB(QtWidgets.QGroupBox):
+    # validator of the temperature field, shared by the downstream and upstream group boxes
+    _temperature_validator = None
+
     def __init__(self, title, color):
         super(CalibrationGB, self).__init__(title)
 
@@ -425,10 +428,16 @@ class CalibrationGB(QtWidgets.QGroupBox):
 
     def style_widgets(self):
 
-        self.temperature_txt.setValidator(QtGui.QDoubleValidator())
+        self.temperature_txt.setValidator(self.get_temperature_validator())
         self.temperature_txt.setAlignment(QtCore.Qt.AlignmentFlag.AlignRight)
         self.temperature_rb.toggle()
 
+    @classmethod
+    def get_temperature_validator(cls):
+        if cls._temperature_validator is None:
+            cls._temperature_validator = QtGui.QDoubleValidator()
+        return cls._temperature_validator
+
     def set_stylesheet(self):
         style_str = "QGroupBox { color: %s; border: 1px solid %s}" % (self.color, self.color)
         self.setStyleSheet(style_str)
@@ -23,7 +23,11 @@ from PyQt6.QtGui import QIcon
 from PyQt6.QtWidgets import QStyle
 import os
 from .CustomWidgets import HorizontalSpacerItem, VerticalSpacerItem
-from .. import resources_path
+from .. import style_path
+
+# icon files used by the widgets in this module, resolved once at import
+_ICONS = {name: os.path.join(style_path, name + '.svg')
+          for name in ('sort_by_alpha', 'watch', 'thermostat_auto', 'timeline', 'rubric', 'filter')}
 
 
 class FileGroupBox(QtWidgets.QGroupBox):
@@ -82,17 +86,17 @@ class FileGroupBox(QtWidgets.QGroupBox):
         self.load_previous_file_btn.setIcon(prev_icon)
         self.browse_by_name_rb = QtWidgets.QRadioButton()
         browse_by_name_icon = QIcon()
-        browse_by_name_icon.addFile(os.path.join(resources_path,'style','sort_by_alpha.svg'))
+        browse_by_name_icon.addFile(_ICONS['sort_by_alpha'])
         self.browse_by_name_rb.setIcon(browse_by_name_icon)
         self.browse_by_name_rb.setChecked(True)
         self.browse_by_time_rb = QtWidgets.QRadioButton()
         browse_by_time_icon = QIcon()
-        browse_by_time_icon.addFile(os.path.join(resources_path,'style','watch.svg'))
+        browse_by_time_icon.addFile(_ICONS['watch'])
         self.browse_by_time_rb.setIcon(browse_by_time_icon)
 
         self.autoprocess_cb = QtWidgets.QCheckBox('auto')
         autoprocess_icon = QIcon()
-        autoprocess_icon.addFile(os.path.join(resources_path,'style','thermostat_auto.svg'))
+        autoprocess_icon.addFile(_ICONS['thermostat_auto'])
         self.autoprocess_cb.setIcon(autoprocess_icon)
 
         self.autoprocess_lbl = QtWidgets.QLabel('')
@@ -114,7 +118,7 @@ class FileGroupBox(QtWidgets.QGroupBox):
         self.two_color_btn = QtWidgets.QPushButton("2 Color")
         self.two_color_btn.setCheckable(True)
         data_history_icon = QIcon()
-        data_history_icon.addFile(os.path.join(resources_path,'style','timeline.svg'))
+        data_history_icon.addFile(_ICONS['timeline'])
         self.data_history_btn.setIcon(data_history_icon)
 
         self._file_control_layout.addWidget(self.data_history_btn)
@@ -162,12 +166,12 @@ class OutputGroupBox(QtWidgets.QGroupBox, object):
         
         self.save_data_btn = QtWidgets.QPushButton("Save Data")
         save_data_icon = QIcon()
-        save_data_icon.addFile(os.path.join(resources_path,'style','rubric.svg'))
+        save_data_icon.addFile(_ICONS['rubric'])
         self.save_data_btn.setIcon(save_data_icon)
 
         self.save_graph_btn = QtWidgets.QPushButton("Save Graph")
         save_graph_icon = QIcon()
-        save_graph_icon.addFile(os.path.join(resources_path,'style','filter.svg'))
+        save_graph_icon.addFile(_ICONS['filter'])
         self.save_graph_btn.setIcon(save_graph_icon)
 
     def create_layout(self):
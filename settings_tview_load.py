@@ -1,10 +1,22 @@
 import re, os
+import argparse
 import h5py
 from pyradiant.model.data_models.SpeFile import SpeFile
-from pyradiant.model.helper.HelperModule import get_partial_index
-import copy
+from pyradiant.model.helper.HelperModule import get_partial_index, get_partial_index_sorted
 import numpy as np
 
+_SECTION_RE = re.compile(r'\[([idsbp])\]')
+_KV_RE = re.compile(r'(.+?)\s*=\s*(.+)')
+
+# Convert values to appropriate data types, keyed by section type
+_CONVERTERS = {
+    'i': int,
+    'd': float,
+    'b': lambda value: value.upper() == "TRUE",
+    's': lambda value: value.strip('"'),  # Remove surrounding quotes if any
+    'p': lambda value: value.strip('"'),
+}
+
 def parse_tview_settings(file_path):
     data = {'i': {}, 'd': {}, 's': {}, 'b': {}, 'p': {}}
     current_type = None
@@ -14,7 +26,7 @@ def parse_tview_settings(file_path):
             line = line.strip()
             
             # Identify the section type based on markers like [i], [d], etc.
-            type_match = re.match(r'\[(i|d|s|b|p)\]', line)
+            type_match = _SECTION_RE.match(line)
             if type_match:
                 current_type = type_match.group(1)
                 continue
@@ -24,20 +36,10 @@ def parse_tview_settings(file_path):
                 continue
             
             # Extract key-value pairs
-            match = re.match(r'(.+?)\s*=\s*(.+)', line)
+            match = _KV_RE.match(line)
             if match:
                 key = match.group(1).strip()
-                value = match.group(2).strip()
-                
-                # Convert values to appropriate data types
-                if current_type == 'i':
-                    value = int(value)
-                elif current_type == 'd':
-                    value = float(value)
-                elif current_type == 'b':
-                    value = value.upper() == "TRUE"
-                elif current_type == 's' or current_type == 'p':
-                    value = value.strip('"')  # Remove surrounding quotes if any
+                value = _CONVERTERS[current_type](match.group(2).strip())
                 
                 data[current_type][key.replace(' ','_')] = value
     
@@ -73,27 +75,33 @@ def get_rois(data,  x_calibration):
 
         ds_start_wl = data['d']['Start_Wavelength_(nm)'+suffix]
         ds_end_wl = data['d']['End_Wavelength_(nm)'+suffix]
-        if ds_start_wl >= np.amin(x_calibration):
-
-            ds_start = round(get_partial_index(x_calibration,ds_start_wl))
+        if x_calibration[0] <= x_calibration[-1]:
+            # ascending calibration, both limits are found with a single binary search. Wavelengths outside of
+            # the calibration are clipped to the first/last pixel
+            wl_limits = np.clip([ds_start_wl, ds_end_wl], x_calibration[0], x_calibration[-1])
+            ds_start, ds_end = (round(ind) for ind in get_partial_index_sorted(x_calibration, wl_limits))
         else:
-            ds_start = 0
-        if ds_end_wl <= np.amax(x_calibration):
+            if ds_start_wl >= np.amin(x_calibration):
 
-            ds_end = round(get_partial_index(x_calibration,ds_end_wl))
-        else:
-            ds_end = x_calibration.shape[0]-1
+                ds_start = round(get_partial_index(x_calibration,ds_start_wl))
+            else:
+                ds_start = 0
+            if ds_end_wl <= np.amax(x_calibration):
+
+                ds_end = round(get_partial_index(x_calibration,ds_end_wl))
+            else:
+                ds_end = x_calibration.shape[0]-1
     ds_roi_list = [ds_start,ds_end, data['i']['Start_row_DN'+suffix], data['i']['bin_DN'+suffix]+data['i']['Start_row_DN'+suffix]]
     
-    us_start = copy.copy(ds_start)
-    us_end = copy.copy(ds_end)
+    us_start = ds_start
+    us_end = ds_end
     us_roi_list = [us_start,us_end, data['i']['Start_row_UP'+suffix], data['i']['bin_UP'+suffix]+data['i']['Start_row_UP'+suffix]]
     
     ds_bg_roi_list = [ds_start,ds_end, data['i']['Start_row_dc'+suffix], data['i']['bin_dc'+suffix]+data['i']['Start_row_dc'+suffix]]
     if 'Start_row_dc'+suffix+'_b' in data['i']:
         us_bg_roi_list = [us_start,us_end, data['i']['Start_row_dc'+suffix+'_b'], data['i']['bin_dc'+suffix+'_b']+data['i']['Start_row_dc'+suffix+'_b']]    
     else:
-        us_bg_roi_list = copy.copy(ds_bg_roi_list)
+        us_bg_roi_list = ds_bg_roi_list[:]
     return ds_roi_list , us_roi_list, ds_bg_roi_list, us_bg_roi_list
 
 def get_calib_paths(data, calib_data_path):
@@ -116,6 +124,16 @@ def get_calib_paths(data, calib_data_path):
 
     return {'ds_calib_filepath':ds_calib_filepath, 'us_calib_filepath':us_calib_filepath}
 
+# parsed calibration files, keyed by (path, modification time)
+_SPE_CACHE: dict[tuple[str, float], SpeFile] = {}
+
+def _cached_spe(path):
+    key = (path, os.path.getmtime(path))
+    spe_file = _SPE_CACHE.get(key)
+    if spe_file is None:
+        spe_file = _SPE_CACHE[key] = SpeFile(path)
+    return spe_file
+
 def save_setting_h5py(calib_filename, tview_calib_filename, calib_data_path):
     data = parse_tview_settings(tview_calib_filename)
     calib_filepaths = get_calib_paths(data, calib_data_path)
@@ -125,13 +143,14 @@ def save_setting_h5py(calib_filename, tview_calib_filename, calib_data_path):
     f.create_group('downstream_calibration')
     ds_group = f['downstream_calibration']
     ds_calibration_img_filepath = calib_filepaths['ds_calib_filepath']
-    ds_calibration_img_file = SpeFile(ds_calibration_img_filepath)
+    ds_calibration_img_file = _cached_spe(ds_calibration_img_filepath)
 
     if ds_calibration_img_file is not None:
-        ds_group['image'] = ds_calibration_img_file.img
-        ds_group['image'].attrs['filename'] =  ds_calibration_img_file.filename
-        ds_group['image'].attrs['x_calibration'] = ds_calibration_img_file.x_calibration
-        ds_group['image'].attrs['subtract_bg'] = True # self.use_insitu_data_background
+        ds_image = ds_group.create_dataset('image', data=ds_calibration_img_file.img,
+                                           chunks=True, compression='lzf', shuffle=True)
+        ds_image.attrs.update({'filename': ds_calibration_img_file.filename,
+                               'x_calibration': ds_calibration_img_file.x_calibration,
+                               'subtract_bg': True}) # self.use_insitu_data_background
     '''else:
         if self.ds_temperature_model.calibration_img is not None:
             ds_group['image'] = # self.ds_temperature_model.calibration_img
@@ -157,13 +176,14 @@ def save_setting_h5py(calib_filename, tview_calib_filename, calib_data_path):
     f.create_group('upstream_calibration')
     us_group = f['upstream_calibration']
     us_calibration_img_filepath = calib_filepaths['us_calib_filepath']
-    us_calibration_img_file = SpeFile(us_calibration_img_filepath)
+    us_calibration_img_file = _cached_spe(us_calibration_img_filepath)
 
     if us_calibration_img_file is not None:
-        us_group['image'] = us_calibration_img_file.img
-        us_group['image'].attrs['filename'] = us_calibration_img_file.filename
-        us_group['image'].attrs['x_calibration'] = us_calibration_img_file.x_calibration
-        us_group['image'].attrs['subtract_bg'] = True # self.use_insitu_data_background
+        us_image = us_group.create_dataset('image', data=us_calibration_img_file.img,
+                                           chunks=True, compression='lzf', shuffle=True)
+        us_image.attrs.update({'filename': us_calibration_img_file.filename,
+                               'x_calibration': us_calibration_img_file.x_calibration,
+                               'subtract_bg': True}) # self.use_insitu_data_background
     '''else:
         if self.us_temperature_model.calibration_img is not None:
             us_group['image'] = # self.us_temperature_model.calibration_img
@@ -180,12 +200,20 @@ def save_setting_h5py(calib_filename, tview_calib_filename, calib_data_path):
 
     f.close()
 
-tview_calib_filename = '/Users/hrubiak/Desktop/calibrations/Ex95_PIMAX.txt'
-fname = os.path.split(tview_calib_filename)[-1].replace('txt','trs')
-
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Convert a T-View settings file into a PyRadiant calibration (.trs) file')
+    parser.add_argument('tview_calib_filename', help='T-View settings file, e.g. Ex95_PIMAX.txt')
+    parser.add_argument('calib_data_path', help='folder containing the calibration .spe files')
+    parser.add_argument('output_dir', nargs='?', default=None,
+                        help='folder for the .trs file, defaults to the folder of the settings file')
+    args = parser.parse_args()
 
-calib_data_path = '/Volumes/hrubiak/Files/Experiments_data/Ex095/temperature/00_Calibrations/PI-MAX'
-calib_filename = os.path.join('/Users/hrubiak/Desktop/trs calibrations',fname)
+    tview_calib_filename = args.tview_calib_filename
+    fname = os.path.split(tview_calib_filename)[-1].replace('txt','trs')
 
-save_setting_h5py(calib_filename, tview_calib_filename, calib_data_path)
+    output_dir = args.output_dir
+    if output_dir is None:
+        output_dir = os.path.dirname(os.path.abspath(tview_calib_filename))
+    calib_filename = os.path.join(output_dir, fname)
 
+    save_setting_h5py(calib_filename, tview_calib_filename, args.calib_data_path)
@@ -1,89 +1,117 @@
 import xml.etree.ElementTree as ET
 import csv
+import os
 
 # Adjust the filenames/paths below:
 xml_filename = "recalculated-115-8May2017.xml"
 csv_filename = "recalculated-115-8May2017.xml.csv"
-
-# Parse the XML
-tree = ET.parse(xml_filename)
-root = tree.getroot()
+# rows are written to this file first, it replaces csv_filename only once the whole XML was converted
+tmp_csv_filename = csv_filename + ".tmp"
 
 # LabVIEW files often have this default namespace:
 ns = {"lv": "http://www.ni.com/LVData"}
+LV = "{" + ns["lv"] + "}"
+I32_TAG = LV + "I32"
+NAME_TAG = LV + "Name"
+VAL_TAG = LV + "Val"
 
-##############################################################################
-# Step 1. Locate the <Array> named "T results"
-##############################################################################
-tresults_array = None
-for arr in root.findall("lv:Array", ns):
-    name_elem = arr.find("lv:Name", ns)
-    if name_elem is not None and name_elem.text == "T results":
-        tresults_array = arr
-        break
-
-if tresults_array is None:
-    raise RuntimeError("Could not find an <Array> named 'T results' in the XML.")
-
-##############################################################################
-# Step 2. Within that array, each child <Cluster> is one 'T result'
-##############################################################################
-tresult_clusters = tresults_array.findall("lv:Cluster", ns)
+# write buffer of the csv file, rows are handed to the os in blocks of this size
+CSV_BUFFER_SIZE = 1 << 20
 
-# We'll accumulate rows of data here
-data_rows = []
+# column of the csv row each I32 field of a frame cluster is written to
+FRAME_FIELDS = {"Frame": 1, "Temperature Dn": 2, "Temperature Up": 3}
 
-for tresult_cluster in tresult_clusters:
 
+def tresult_rows(tresult_cluster):
+    """
+    Yields one [file, frame, temperature dn, temperature up] row for every frame of a 'T result' cluster.
+    """
     # Find <String> named "File"
-    file_string = tresult_cluster.find("lv:String[lv:Name='File']", ns)
-    if file_string is not None:
-        file_val_elem = file_string.find("lv:Val", ns)
-        file_name = file_val_elem.text if file_val_elem is not None else ""
-    else:
-        file_name = ""
-
-    # Find the frames array
+    file_val_elem = tresult_cluster.find("lv:String[lv:Name='File']/lv:Val", ns)
+    file_name = file_val_elem.text if file_val_elem is not None else ""
+
+    # Find the frames array, if there's no frames array this cluster has no rows
     frames_array = tresult_cluster.find("lv:Array[lv:Name='frames']", ns)
     if frames_array is None:
-        # If there's no frames array, skip this cluster
-        continue
+        return
 
     # Each child <Cluster> in "frames" is one frame
-    frame_clusters = frames_array.findall("lv:Cluster", ns)
-
-    for frame_cluster in frame_clusters:
-        # Initialize
-        frame_num = None
-        temp_dn   = None
-        temp_up   = None
-
-        # Loop over each I32 field in the frame cluster
-        for i32_elem in frame_cluster.findall("lv:I32", ns):
-            field_name_elem = i32_elem.find("lv:Name", ns)
-            field_val_elem  = i32_elem.find("lv:Val", ns)
+    for frame_cluster in frames_array.iterfind("lv:Cluster", ns):
+        row = [file_name, None, None, None]
+        # the children are scanned once, find() with a plain tag bypasses the XPath engine
+        for child in frame_cluster:
+            if child.tag == I32_TAG:
+                name_elem, val_elem = i32_name_val(child)
+                if name_elem is not None and val_elem is not None:
+                    column = FRAME_FIELDS.get(name_elem.text)
+                    if column is not None:
+                        row[column] = val_elem.text
+        yield row
+
+
+def i32_name_val(i32_elem):
+    """
+    Returns the <Name> and <Val> elements of a LabVIEW <I32>. LabVIEW writes them as the first two children, their
+    tags are checked and the elements are searched for only if the order differs.
+    """
+    if len(i32_elem) >= 2:
+        name_elem, val_elem = i32_elem[0], i32_elem[1]
+        if name_elem.tag == NAME_TAG and val_elem.tag == VAL_TAG:
+            return name_elem, val_elem
+    return i32_elem.find(NAME_TAG), i32_elem.find(VAL_TAG)
 
-            if field_name_elem is not None and field_val_elem is not None:
-                field_name = field_name_elem.text
-                field_val  = field_val_elem.text
-
-                if field_name == "Frame":
-                    frame_num = field_val
-                elif field_name == "Temperature Dn":
-                    temp_dn = field_val
-                elif field_name == "Temperature Up":
-                    temp_up = field_val
-
-        data_rows.append([file_name, frame_num, temp_dn, temp_up])
 
 ##############################################################################
-# Step 3. Write out the CSV
+# The XML is streamed: every top level element is released once it is closed, within the <Array> named
+# "T results" each child <Cluster> ('T result') is written to the CSV and released as soon as it is complete.
+# This keeps only one 'T result' in memory instead of the whole document tree.
 ##############################################################################
-with open(csv_filename, "w", newline="") as f:
+def write_csv(f):
+    """
+    Streams the 'T results' rows of the XML into the csv file f, returns the number of rows and whether the
+    'T results' array was found.
+    """
+    row_count = 0
+    tresults_found = False
+    in_tresults = False
+    stack = []
+
     writer = csv.writer(f)
     # header
     writer.writerow(["File", "Frame", "Temperature Dn", "Temperature Up"])
-    # data
-    writer.writerows(data_rows)
 
-print(f"Done! Wrote {len(data_rows)} rows to {csv_filename}.")
\ No newline at end of file
+    for event, elem in ET.iterparse(xml_filename, events=("start", "end")):
+        if event == "start":
+            stack.append(elem)
+            continue
+
+        stack.pop()
+        depth = len(stack)
+        if depth == 2 and elem.tag == NAME_TAG and stack[1].tag == LV + "Array":
+            # only the first array named "T results" is used
+            in_tresults = elem.text == "T results" and not tresults_found
+            tresults_found = tresults_found or in_tresults
+        elif depth == 2 and in_tresults and elem.tag == LV + "Cluster":
+            rows = list(tresult_rows(elem))
+            writer.writerows(rows)
+            row_count += len(rows)
+            stack[1].remove(elem)
+        elif depth == 1:
+            in_tresults = False
+            stack[0].remove(elem)
+    return row_count, tresults_found
+
+
+try:
+    with open(tmp_csv_filename, "w", newline="", buffering=CSV_BUFFER_SIZE) as f:
+        row_count, tresults_found = write_csv(f)
+    if not tresults_found:
+        raise RuntimeError("Could not find an <Array> named 'T results' in the XML.")
+except BaseException:
+    # an existing csv file is only replaced by a complete conversion
+    if os.path.exists(tmp_csv_filename):
+        os.remove(tmp_csv_filename)
+    raise
+os.replace(tmp_csv_filename, csv_filename)
+
+print(f"Done! Wrote {row_count} rows to {csv_filename}.")